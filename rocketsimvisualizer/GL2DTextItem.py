@@ -6,7 +6,33 @@ class GL2DTextItem(GLGraphicsItem.GLGraphicsItem):
     def __init__(self, font_size=11, **kwds):
         super().__init__(**kwds)
         self.font_size = font_size
-        self.text = ""
+
+        # every line is laid out once as a QStaticText and only redone when that line changes
+        self.lines = []
+        self.static_texts = []
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    @text.setter
+    def text(self, text):
+        self.setLines(text.split("\n"))
+
+    def setLines(self, lines):
+        for i, line in enumerate(lines):
+            if i < len(self.lines) and self.lines[i] == line:
+                continue
+            if i < len(self.static_texts):
+                self.static_texts[i].setText(line)
+            else:
+                static_text = QtGui.QStaticText(line)
+                static_text.setTextFormat(QtCore.Qt.TextFormat.PlainText)
+                static_text.setPerformanceHint(QtGui.QStaticText.PerformanceHint.AggressiveCaching)
+                self.static_texts.append(static_text)
+
+        del self.static_texts[len(lines):]
+        self.lines = list(lines)
 
     def paint(self):
         self.setupGLState()
@@ -22,7 +48,6 @@ class GL2DTextItem(GLGraphicsItem.GLGraphicsItem):
         painter.setPen(QtCore.Qt.GlobalColor.white)
         painter.setRenderHints(QtGui.QPainter.RenderHint.Antialiasing | QtGui.QPainter.RenderHint.TextAntialiasing)
 
-        rect = self.view().rect()
-        af = QtCore.Qt.AlignmentFlag
-
-        painter.drawText(rect, af.AlignTop | af.AlignLeft, self.text)
+        line_height = painter.fontMetrics().height()
+        for i, static_text in enumerate(self.static_texts):
+            painter.drawStaticText(0, i * line_height, static_text)
@@ -0,0 +1,170 @@
+from rocketsimvisualizer.shader import instancedShader
+
+from pyqtgraph.opengl import GLGraphicsItem
+from OpenGL.GL import *
+
+import numpy as np
+import ctypes
+
+
+def mesh_to_triangles(vertexes, faces, face_colors=None):
+    # flatten an indexed mesh so every face can have its own color
+    tri_verts = np.asarray(vertexes)[np.asarray(faces)].reshape(-1, 3)
+    tri_colors = None
+    if face_colors is not None:
+        tri_colors = np.repeat(np.asarray(face_colors), 3, axis=0)
+    return tri_verts, tri_colors
+
+
+def mesh_to_lines(vertexes, faces):
+    # unique triangle edges, same as what GLMeshItem draws with drawEdges=True
+    faces = np.asarray(faces)
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+    return np.asarray(vertexes)[edges].reshape(-1, 3)
+
+
+def circle_lines(cols=8):
+    th = np.linspace(0, 2 * np.pi, cols, endpoint=False)
+    ring = np.stack([np.cos(th), np.sin(th), np.zeros(cols)], axis=1)
+    return np.stack([ring, np.roll(ring, -1, axis=0)], axis=1).reshape(-1, 3)
+
+
+# draws the same geometry once per instance in a single draw call, each instance has
+# its own 4x4 model matrix and RGBA color which is multiplied with the vertex colors
+class GLInstancedMeshItem(GLGraphicsItem.GLGraphicsItem):
+
+    def __init__(self, vertexes, vertex_colors=None, mode=GL_TRIANGLES, line_width=1, **kwds):
+        glopts = kwds.pop('glOptions', 'opaque')
+        super().__init__(**kwds)
+        self.setGLOptions(glopts)
+
+        self.vertexes = np.ascontiguousarray(vertexes, dtype=np.float32)
+        if vertex_colors is None:
+            vertex_colors = np.ones((len(self.vertexes), 4))
+        self.vertex_colors = np.ascontiguousarray(vertex_colors, dtype=np.float32)
+        self.mode = mode
+        self.line_width = line_width
+
+        # instance data is kept in preallocated arrays that mirror the GPU buffers, the buffers
+        # are only reallocated when the capacity grows and otherwise updated in place
+        self.num_instances = 0
+        self.capacity = 0
+        self.transform_data = np.zeros((0, 4, 4), dtype=np.float32)  # column-major, as GL expects
+        self.color_data = np.zeros((0, 4), dtype=np.float32)
+        self.buffer_capacity = 0
+        self.transforms_dirty = False
+        self.colors_dirty = False
+
+        self.vao = None
+        self.vbos = None
+
+    def reserve(self, capacity):
+        if capacity <= self.capacity:
+            return
+        self.capacity = max(capacity, self.capacity * 2)
+        transform_data = np.zeros((self.capacity, 4, 4), dtype=np.float32)
+        color_data = np.ones((self.capacity, 4), dtype=np.float32)
+        transform_data[:len(self.transform_data)] = self.transform_data
+        color_data[:len(self.color_data)] = self.color_data
+        self.transform_data = transform_data
+        self.color_data = color_data
+
+    def setInstanceData(self, transforms, colors=None):
+        # transforms are (n, 4, 4) row-major matrices, colors are (n, 4) or None to keep the current ones
+        transforms = np.asarray(transforms).reshape(-1, 4, 4)
+        self.reserve(len(transforms))
+        self.num_instances = len(transforms)
+        np.copyto(self.transform_data[:self.num_instances], transforms.transpose(0, 2, 1))
+        self.transforms_dirty = True
+
+        if colors is not None:
+            self.setInstanceColors(colors)
+
+    def setInstanceColors(self, colors):
+        # only uploaded when they actually changed, compared as float32 like the buffer they're stored in
+        colors = np.asarray(colors, dtype=np.float32).reshape(-1, 4)
+        self.reserve(len(colors))
+        if np.array_equal(self.color_data[:len(colors)], colors):
+            return
+        self.color_data[:len(colors)] = colors
+        self.colors_dirty = True
+
+    def initializeGL(self):
+        if self.vao is not None:
+            return
+
+        self.vao = glGenVertexArrays(1)
+        self.vbos = glGenBuffers(4)
+        glBindVertexArray(self.vao)
+
+        # per-vertex data
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbos[0])
+        glBufferData(GL_ARRAY_BUFFER, self.vertexes.nbytes, self.vertexes, GL_STATIC_DRAW)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbos[1])
+        glBufferData(GL_ARRAY_BUFFER, self.vertex_colors.nbytes, self.vertex_colors, GL_STATIC_DRAW)
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, 0, None)
+
+        # per-instance model matrix, one vec4 column per attribute location
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbos[2])
+        for i in range(4):
+            glEnableVertexAttribArray(2 + i)
+            glVertexAttribPointer(2 + i, 4, GL_FLOAT, GL_FALSE, 64, ctypes.c_void_p(16 * i))
+            glVertexAttribDivisor(2 + i, 1)
+
+        # per-instance color
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbos[3])
+        glEnableVertexAttribArray(6)
+        glVertexAttribPointer(6, 4, GL_FLOAT, GL_FALSE, 0, None)
+        glVertexAttribDivisor(6, 1)
+
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.buffer_capacity = 0
+
+    def upload_instances(self):
+        if self.buffer_capacity < self.capacity:
+            # (re)allocate both buffers with the full capacity and upload everything
+            for vbo, data in ((self.vbos[2], self.transform_data), (self.vbos[3], self.color_data)):
+                glBindBuffer(GL_ARRAY_BUFFER, vbo)
+                glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_DYNAMIC_DRAW)
+            self.buffer_capacity = self.capacity
+        else:
+            if self.transforms_dirty:
+                glBindBuffer(GL_ARRAY_BUFFER, self.vbos[2])
+                glBufferSubData(GL_ARRAY_BUFFER, 0, self.num_instances * 64, self.transform_data)
+            if self.colors_dirty:
+                glBindBuffer(GL_ARRAY_BUFFER, self.vbos[3])
+                glBufferSubData(GL_ARRAY_BUFFER, 0, self.color_data.nbytes, self.color_data)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.transforms_dirty = False
+        self.colors_dirty = False
+
+    def paint(self):
+        num_instances = self.num_instances
+        if num_instances == 0 or len(self.vertexes) == 0:
+            return
+
+        self.initializeGL()
+        self.setupGLState()
+
+        if self.transforms_dirty or self.colors_dirty or self.buffer_capacity < self.capacity:
+            self.upload_instances()
+
+        mat_mvp = np.array(self.mvpMatrix().data(), dtype=np.float32)
+
+        with instancedShader:
+            program = instancedShader.program()
+            glUniformMatrix4fv(glGetUniformLocation(program, "u_mvp"), 1, GL_FALSE, mat_mvp)
+
+            if self.mode == GL_LINES:
+                glLineWidth(self.line_width)
+
+            glBindVertexArray(self.vao)
+            glDrawArraysInstanced(self.mode, 0, len(self.vertexes), num_instances)
+            glBindVertexArray(0)
@@ -0,0 +1,123 @@
+from rocketsimvisualizer.shader import trailShader
+
+from pyqtgraph.opengl import GLGraphicsItem
+from OpenGL.GL import *
+
+import numpy as np
+import ctypes
+
+
+# Draws the position history of several objects as fading line strips. The history is a ring
+# buffer of `length` slots with the positions of every trail interleaved per slot, so appending
+# a frame only uploads that one slot. Slot `length` mirrors slot 0 to close the strip at the wrap.
+class GLTrailItem(GLGraphicsItem.GLGraphicsItem):
+
+    def __init__(self, num_trails=0, length=120, colors=None, line_width=2, **kwds):
+        glopts = kwds.pop('glOptions', 'translucent')
+        super().__init__(**kwds)
+        self.setGLOptions(glopts)
+
+        self.line_width = line_width
+        self.vbo = None
+        self.buffer_size = 0
+        self.resize(num_trails, length, colors)
+
+    def resize(self, num_trails, length=None, colors=None):
+        if length is not None:
+            self.length = max(int(length), 2)
+        self.num_trails = num_trails
+        self.data = np.zeros((self.length + 1, num_trails, 3), dtype=np.float32)
+        if colors is None:
+            colors = np.ones((num_trails, 4))
+        self.colors = np.array(colors, dtype=np.float32).reshape(num_trails, 4)
+
+        self.head = 0
+        self.num_points = 0  # trails start empty and grow up to length
+        self.dirty_slots = np.zeros(self.length + 1, dtype=bool)  # slots to upload on the next paint
+        self.data_dirty = True
+
+    def setColors(self, colors):
+        self.colors[:] = colors
+
+    def clear(self):
+        self.num_points = 0
+
+    def append(self, positions, num_samples=1):
+        # positions is (num_trails, 3), in render coordinates. When more than one sample interval passed
+        # since the last append, the gap is filled with a straight line so the trail keeps its time span
+        if num_samples > 1 and self.num_points:
+            last = self.data[self.head].copy()
+            for i in range(max(num_samples - self.length, 1), num_samples):
+                self.append_point(last + (positions - last) * (i / num_samples))
+        self.append_point(positions)
+
+    def append_point(self, positions):
+        if self.num_points == 0:
+            self.head = 0
+        else:
+            self.head = (self.head + 1) % self.length
+        self.num_points = min(self.num_points + 1, self.length)
+
+        self.data[self.head] = positions
+        self.dirty_slots[self.head] = True
+        if self.head == 0:
+            self.data[self.length] = positions
+            self.dirty_slots[self.length] = True
+
+    def initializeGL(self):
+        if self.vbo is not None:
+            return
+        self.vbo = glGenBuffers(1)
+        self.data_dirty = True
+
+    def upload(self):
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        if self.data_dirty or self.buffer_size != self.data.nbytes:
+            glBufferData(GL_ARRAY_BUFFER, self.data.nbytes, self.data, GL_DYNAMIC_DRAW)
+            self.buffer_size = self.data.nbytes
+        else:
+            slot_size = self.data[0].nbytes
+            for slot in np.flatnonzero(self.dirty_slots):
+                glBufferSubData(GL_ARRAY_BUFFER, slot * slot_size, slot_size, self.data[slot])
+        self.dirty_slots[:] = False
+        self.data_dirty = False
+
+    def paint(self):
+        if self.num_trails == 0 or self.num_points < 2:
+            return
+
+        self.initializeGL()
+        self.setupGLState()
+
+        if self.data_dirty or self.dirty_slots.any():
+            self.upload()
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+
+        mat_mvp = np.array(self.mvpMatrix().data(), dtype=np.float32)
+
+        # oldest to newest, split in two strips where the ring wraps around
+        if self.num_points < self.length:
+            strips = [(0, self.num_points)]
+        else:
+            strips = [(self.head + 1, self.length - self.head), (0, self.head + 1)]
+
+        with trailShader:
+            program = trailShader.program()
+            glUniformMatrix4fv(glGetUniformLocation(program, "u_mvp"), 1, GL_FALSE, mat_mvp)
+            glUniform1i(glGetUniformLocation(program, "u_head"), self.head)
+            glUniform1i(glGetUniformLocation(program, "u_length"), self.length)
+            color_location = glGetUniformLocation(program, "u_color")
+            glLineWidth(self.line_width)
+
+            glEnableVertexAttribArray(0)
+            stride = self.data[0].nbytes
+            for i in range(self.num_trails):
+                glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(12 * i))
+                glUniform4fv(color_location, 1, self.colors[i])
+                for first, count in strips:
+                    if count > 1:
+                        glDrawArrays(GL_LINE_STRIP, first, count)
+            glDisableVertexAttribArray(0)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
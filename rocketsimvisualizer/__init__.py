@@ -1,6 +1,52 @@
-from .generic_controller import GenericController
-from .keyboard_controller import KeyboardController
-from .xbox_controller import XboxController
-from .composite_controller import CompositeController
-from .GL2DTextItem import GL2DTextItem
-from .visualizer import Visualizer, VisualizerThread
+import importlib
+import types
+import sys
+
+# public names and the submodules they live in, imported on first access so that e.g. recording
+# or streaming from a training worker doesn't pull in Qt, OpenGL or gamepad probing
+_lazy_attributes = {
+    "GenericController": "generic_controller",
+    "KeyboardController": "keyboard_controller",
+    "XboxController": "xbox_controller",
+    "CompositeController": "composite_controller",
+    "GL2DTextItem": "GL2DTextItem",
+    "GLInstancedMeshItem": "GLInstancedMeshItem",
+    "GLTrailItem": "GLTrailItem",
+    "Visualizer": "visualizer",
+    "VisualizerThread": "visualizer",
+    "Recorder": "recording",
+    "RecordingReader": "recording",
+    "ReplayPlayer": "replay",
+    "ControlsRecorder": "controls_recording",
+    "ControlsReplayController": "controls_recording",
+    "SharedMemoryPublisher": "shm_stream",
+    "SharedMemorySource": "shm_stream",
+    "StreamPublisher": "net_stream",
+    "StreamSource": "net_stream",
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name):
+    module_name = _lazy_attributes.get(name, None)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _LazyModule(types.ModuleType):
+    def __setattr__(self, name, value):
+        # importing the GL*Item submodules would otherwise shadow the classes of the same name
+        if name in _lazy_attributes and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyModule
@@ -1,20 +1,141 @@
 from pathlib import Path
 import numpy as np
+import os
 
+CACHE_VERSION = 1
+MESH_SCALE = 50
+WELD_PRECISION = 1  # vertices closer than this (in uu) are treated as the same when finding edges
 
-def get_arena_mesh(meshes_path="collision_meshes", subfolder="soccar"):
-    field_v = []
-    field_f = []
 
+def read_cmf(file_path):
+    with open(file_path, "rb") as file:
+        num_tris, num_verts = np.fromfile(file, "i", count=2)
+        tris = np.fromfile(file, "i", count=num_tris * 3).reshape(-1, 3)
+        verts = np.fromfile(file, "f", count=num_verts * 3).reshape(-1, 3)
+    return tris, verts
+
+
+def get_cache_key(file_paths):
+    # any added, removed or modified .cmf file invalidates the cache
+    key = [f"v{CACHE_VERSION}"]
+    for file_path in file_paths:
+        stat = file_path.stat()
+        key.append(f"{file_path.name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "\n".join(key)
+
+
+def load_cached_arrays(cache_path, cache_key, names):
+    try:
+        with np.load(cache_path) as cache:
+            if str(cache["key"]) != cache_key:
+                return None
+            return tuple(cache[name] for name in names)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def save_cached_arrays(cache_path, cache_key, **arrays):
+    # write to a temporary file first so a concurrent reader never sees a partial cache
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as file:
+            np.savez(file, key=np.array(cache_key), **arrays)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+def merge_meshes(meshes):
+    if not meshes:
+        return np.zeros((0, 3), np.float32), np.zeros((0, 3), np.uint32)
+
+    tris_list, verts_list = zip(*meshes)
+    vert_counts = np.array([len(verts) for verts in verts_list])
+    offsets = np.concatenate(([0], np.cumsum(vert_counts)[:-1]))
+
+    field_v = np.concatenate(verts_list).astype(np.float32) * MESH_SCALE
+    field_f = np.concatenate([tris + offset for tris, offset in zip(tris_list, offsets)])
+
+    return np.ascontiguousarray(field_v), np.ascontiguousarray(field_f, dtype=np.uint32)
+
+
+def get_arena_mesh(meshes_path="collision_meshes", subfolder="soccar", use_cache=True):
     resolved_path = Path(meshes_path).resolve()
+    file_paths = sorted((resolved_path / subfolder).glob("*.cmf"))
+
+    cache_path = resolved_path / f"{subfolder}.npz"
+    cache_key = get_cache_key(file_paths)
 
-    for file_path in (resolved_path / subfolder).glob("*.cmf"):
-        with open(file_path, "rb") as file:
-            num_tris, num_verts = np.fromfile(file, "i", count=2)
-            tris = np.fromfile(file, "3i", count=num_tris)
-            verts = np.fromfile(file, "3f", count=num_verts) * 50
+    if use_cache:
+        cached_mesh = load_cached_arrays(cache_path, cache_key, ("vertexes", "faces"))
+        if cached_mesh is not None:
+            return cached_mesh
 
-            field_f += list(tris + len(field_v))
-            field_v += list(verts)
+    field_v, field_f = merge_meshes([read_cmf(file_path) for file_path in file_paths])
+
+    if use_cache and file_paths:
+        save_cached_arrays(cache_path, cache_key, vertexes=field_v, faces=field_f)
 
     return field_v, field_f
+
+
+def get_feature_edges(vertexes, faces, crease_angle=30):
+    # edges between faces meeting at more than crease_angle degrees, plus open and non-manifold edges,
+    # returned as (n * 2, 3) line vertices
+    vertexes = np.asarray(vertexes)
+    faces = np.asarray(faces, dtype=np.int64)
+    if len(faces) == 0:
+        return np.zeros((0, 3), np.float32)
+
+    # the meshes come from separate files and repeat vertices, weld them so neighbors share edges
+    _, vertex_ids = np.unique(np.round(vertexes / WELD_PRECISION), axis=0, return_inverse=True)
+    vertex_ids = vertex_ids.reshape(-1)
+    welded_faces = vertex_ids[faces]
+
+    tri_verts = vertexes[faces]
+    normals = np.cross(tri_verts[:, 1] - tri_verts[:, 0], tri_verts[:, 2] - tri_verts[:, 0])
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-9)
+
+    # every face edge with the face it belongs to, sorted so equal edges are next to each other
+    edges = np.concatenate([welded_faces[:, [0, 1]], welded_faces[:, [1, 2]], welded_faces[:, [2, 0]]])
+    vertex_edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    edge_faces = np.tile(np.arange(len(faces)), 3)
+    edges.sort(axis=1)
+    order = np.lexsort((edges[:, 1], edges[:, 0]))
+    edges, vertex_edges, edge_faces = edges[order], vertex_edges[order], edge_faces[order]
+
+    new_group = np.ones(len(edges), dtype=bool)
+    new_group[1:] = np.any(edges[1:] != edges[:-1], axis=1)
+    group_starts = np.flatnonzero(new_group)
+    group_sizes = np.diff(np.append(group_starts, len(edges)))
+
+    keep = group_sizes != 2
+    shared = np.flatnonzero(group_sizes == 2)
+    first_faces = edge_faces[group_starts[shared]]
+    second_faces = edge_faces[group_starts[shared] + 1]
+    # abs since the winding of the collision meshes isn't always consistent
+    cos_angles = np.abs(np.sum(normals[first_faces] * normals[second_faces], axis=1))
+    keep[shared] = cos_angles < np.cos(np.radians(crease_angle))
+
+    return np.ascontiguousarray(vertexes[vertex_edges[group_starts[keep]]].reshape(-1, 3), dtype=np.float32)
+
+
+def get_arena_edges(meshes_path="collision_meshes", subfolder="soccar", crease_angle=30, use_cache=True):
+    resolved_path = Path(meshes_path).resolve()
+    file_paths = sorted((resolved_path / subfolder).glob("*.cmf"))
+
+    cache_path = resolved_path / f"{subfolder}-edges.npz"
+    cache_key = f"{get_cache_key(file_paths)}\ncrease_angle:{crease_angle}"
+
+    if use_cache:
+        cached_edges = load_cached_arrays(cache_path, cache_key, ("edges",))
+        if cached_edges is not None:
+            return cached_edges[0]
+
+    field_v, field_f = get_arena_mesh(meshes_path, subfolder, use_cache)
+    edges = get_feature_edges(field_v, field_f, crease_angle)
+
+    if use_cache and file_paths:
+        save_cached_arrays(cache_path, cache_key, edges=edges)
+
+    return edges
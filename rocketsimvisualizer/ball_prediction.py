@@ -0,0 +1,111 @@
+import RocketSim as rs
+
+import numpy as np
+
+import threading
+
+
+class BallPrediction:
+    def __init__(self, tick_count, positions):
+        self.tick_count = tick_count  # tick of positions[0], there's one position per tick after that
+        self.positions = positions
+
+    def get_pos(self, tick_count):
+        i = int(tick_count) - self.tick_count
+        if 0 <= i < len(self.positions):
+            return self.positions[i]
+        return None
+
+    def get_first_marker(self, tick_count, marker_ticks):
+        # index of the first marker every marker_ticks the ball hasn't passed yet
+        elapsed_ticks = max(int(tick_count) - self.tick_count, 0)
+        return -(-elapsed_ticks // marker_ticks)
+
+
+# Steps a copy of the arena ahead in a background thread, the render loop only hands over the
+# current ball state and picks up the latest finished prediction, it never waits for one.
+# Without cars a single ball-only arena is reused, with cars a clone of the arena is stepped.
+class BallPredictor(threading.Thread):
+    def __init__(self, arena, seconds=3.0, tolerance=10.0, with_cars=False):
+        super().__init__(daemon=True)
+        self.arena = arena
+        self.num_ticks = round(seconds * arena.tick_rate)
+        self.tolerance = tolerance  # distance from the predicted position that triggers a new prediction
+        self.with_cars = with_cars
+        self.running = False
+
+        self.prediction = None  # latest finished BallPrediction, replaced as a whole
+        self.pending = None  # (tick_count, ball_state, arena or None)
+        self.busy = False
+        self.request_event = threading.Event()
+
+        self.ball_arena = None
+
+    def get_ball_arena(self):
+        if self.ball_arena is None:
+            self.ball_arena = rs.Arena(self.arena.game_mode, tick_rate=self.arena.tick_rate)
+            self.ball_arena.set_mutator_config(self.arena.get_mutator_config())
+        return self.ball_arena
+
+    def needs_update(self, tick_count, ball_pos):
+        prediction = self.prediction
+        if prediction is None:
+            return True
+
+        # keep at least half of the prediction ahead of the ball
+        if tick_count - prediction.tick_count > self.num_ticks // 2:
+            return True
+
+        predicted_pos = prediction.get_pos(tick_count)
+        if predicted_pos is None:
+            return True
+        return np.linalg.norm(predicted_pos - ball_pos) > self.tolerance
+
+    def update(self, tick_count, ball, ball_state=None):
+        # called every frame from the render loop with the snapshot ball record,
+        # only copies state when a new prediction is needed
+        if self.busy:
+            return
+
+        # the record can be interpolated between ticks, the state object is exactly at tick_count
+        ball_pos = ball["pos"] if ball_state is None else ball_state.pos.as_numpy()
+        if not self.needs_update(tick_count, ball_pos):
+            return
+
+        if ball_state is None:
+            ball_state = rs.BallState()
+            ball_state.pos = rs.Vec(*ball["pos"])
+            ball_state.vel = rs.Vec(*ball["vel"])
+            ball_state.ang_vel = rs.Vec(*ball["ang_vel"])
+        arena = self.arena.clone() if self.with_cars else None
+        self.busy = True
+        self.pending = (int(tick_count), ball_state, arena)
+        self.request_event.set()
+
+    def predict(self, tick_count, ball_state, arena=None):
+        if arena is None:
+            arena = self.get_ball_arena()
+            arena.ball.set_state(ball_state)
+
+        positions = np.zeros((self.num_ticks + 1, 3))
+        positions[0] = ball_state.pos.as_numpy()
+        for i in range(1, self.num_ticks + 1):
+            arena.step(1)
+            positions[i] = arena.ball.get_state().pos.as_numpy()
+
+        return BallPrediction(tick_count, positions)
+
+    def run(self):
+        self.running = True
+        while self.running:
+            if not self.request_event.wait(0.1):
+                continue
+            self.request_event.clear()
+
+            request, self.pending = self.pending, None
+            if request is not None:
+                self.prediction = self.predict(*request)
+            self.busy = False
+
+    def stop(self):
+        self.running = False
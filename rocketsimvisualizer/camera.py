@@ -0,0 +1,145 @@
+from rocketsimvisualizer.constants import mirror_x
+
+import numpy as np
+
+import time
+import math
+
+
+def wrap_degrees(angle):
+    return (angle + 180) % 360 - 180
+
+
+# Moves the GLViewWidget camera from the arena snapshot. Cars are kept in a sorted id list with
+# their snapshot rows so switching cars/targets and looking them up never builds anything per frame.
+# SMOOTHING in the camera config is a time constant in seconds, 0 follows the targets exactly.
+class CameraController:
+    def __init__(self, view, cam_dict):
+        self.view = view
+        self.cam_dict = cam_dict
+        self.smoothing = cam_dict.get("SMOOTHING", 0)
+
+        self.car_id = None  # id of the car we control/spectate
+        self.target_id = 0  # item to track with target cam, 0 for ball otherwise a car id
+        self.manual_swivel = False  # used when moving the camera manually
+        self.target_cam = True  # general form of ball cam that can track other cars too
+        self.free_cam = False  # don't use player cam
+
+        self.car_ids = []  # sorted
+        self.car_rows = {}  # car id -> row in the snapshot car array
+
+        self.cam_pos = np.zeros(3)
+        self.last_time = None
+
+    def set_cars(self, car_ids):
+        # car_ids in snapshot order, only called when the cars change
+        self.car_rows = {car_id: i for i, car_id in enumerate(car_ids)}
+        self.car_ids = sorted(car_ids)
+
+        if self.car_id not in self.car_rows:
+            self.car_id = None
+            self.switch_car()
+
+        if self.target_id != 0 and self.target_id not in self.car_rows:
+            self.target_id = 0
+
+    def switch_car(self):
+        if self.car_ids:
+            if self.car_id in self.car_rows:
+                car_index = self.car_ids.index(self.car_id)
+                self.car_id = self.car_ids[(car_index + 1) % len(self.car_ids)]
+            else:
+                self.car_id = self.car_ids[0]
+        else:
+            self.car_id = None
+
+        if self.car_id == self.target_id:
+            self.switch_target()
+
+    def switch_target(self):
+        # cycles through the ball and every car but our own, in id order
+        target_ids = [0] + [car_id for car_id in self.car_ids if car_id != self.car_id]
+        if self.target_id in target_ids:
+            self.target_id = target_ids[(target_ids.index(self.target_id) + 1) % len(target_ids)]
+        else:
+            self.target_id = 0
+
+    def toggle_target_cam(self):
+        self.target_cam = not self.target_cam
+
+    def toggle_free_cam(self):
+        self.free_cam = not self.free_cam
+
+    def get_target_pos(self, snapshot):
+        # in render coordinates
+        row = self.car_rows.get(self.target_id, None)
+        if row is None:
+            return snapshot.ball["pos"] * mirror_x
+        return snapshot.cars["pos"][row] * mirror_x
+
+    def get_camera_position(self):
+        # same as GLViewWidget.cameraPosition() without going through Qt matrices
+        opts = self.view.opts
+        center = opts["center"]
+        distance = opts["distance"]
+        elevation = math.radians(opts["elevation"])
+        azimuth = math.radians(opts["azimuth"])
+        self.cam_pos[0] = center.x() + distance * math.cos(elevation) * math.cos(azimuth)
+        self.cam_pos[1] = center.y() + distance * math.cos(elevation) * math.sin(azimuth)
+        self.cam_pos[2] = center.z() + distance * math.sin(elevation)
+        return self.cam_pos
+
+    def get_smoothing_factor(self):
+        now = time.perf_counter()
+        dt = 0 if self.last_time is None else now - self.last_time
+        self.last_time = now
+        if self.smoothing <= 0:
+            return 1
+        return 1 - math.exp(-dt / self.smoothing)
+
+    def update(self, snapshot):
+        alpha = self.get_smoothing_factor()
+        if self.free_cam:
+            return
+
+        opts = self.view.opts
+        azimuth = opts["azimuth"]
+        elevation = opts["elevation"]
+
+        # center camera around the car
+        row = self.car_rows.get(self.car_id, None)
+        if row is not None:
+            car_pos = snapshot.cars["pos"][row].tolist()
+            center = opts["center"]
+            center.setX(center.x() + (-car_pos[0] - center.x()) * alpha)
+            center.setY(center.y() + (car_pos[1] - center.y()) * alpha)
+            center.setZ(center.z() + (car_pos[2] + self.cam_dict["HEIGHT"] - center.z()) * alpha)
+
+        if self.manual_swivel:
+            return
+
+        if self.target_cam:
+            rel_target_pos = (self.get_target_pos(snapshot) - self.get_camera_position()) * [-1, 1, 1]
+            rel_target_pos_norm = np.linalg.norm(rel_target_pos)
+
+            target_azimuth = math.atan2(rel_target_pos[1], rel_target_pos[0])
+
+            target_elevation = 0
+            if rel_target_pos_norm != 0:
+                target_elevation = math.asin(rel_target_pos[2] / rel_target_pos_norm)
+
+            smaller_target_elevation = target_elevation * 2 / 3
+            azimuth = -target_azimuth / math.pi * 180
+            elevation = self.cam_dict["ANGLE"] - smaller_target_elevation / math.pi * 180
+
+        elif row is not None:
+            # non-target_cam cam
+            car_vel = snapshot.cars["vel"][row]
+            car_vel_2d_norm = math.sqrt(car_vel[1] ** 2 + car_vel[0] ** 2)
+            if car_vel_2d_norm > 50:  # don't be sensitive to near 0 vel changes
+                car_vel_azimuth = math.atan2(car_vel[1], car_vel[0])
+                azimuth = -car_vel_azimuth / math.pi * 180
+                elevation = self.cam_dict["ANGLE"]
+
+        opts["azimuth"] += wrap_degrees(azimuth - opts["azimuth"]) * alpha
+        opts["elevation"] += (elevation - opts["elevation"]) * alpha
@@ -28,6 +28,17 @@ PAD_SQ_RAD_SMALL = 120
 pad_sq_dims_big = np.array([PAD_SQ_RAD_BIG, PAD_SQ_RAD_BIG, PAD_SQ_HEIGHT]) * 2
 pad_sq_dims_small = np.array([PAD_SQ_RAD_SMALL, PAD_SQ_RAD_SMALL, PAD_SQ_HEIGHT]) * 2
 
+# seconds before a boost pad is active again after being picked up
+PAD_COOLDOWN_BIG = 10
+PAD_COOLDOWN_SMALL = 4
+
+# bounding sphere radius of a car hitbox, used for frustum culling
+CAR_CULL_RADIUS = 120
+
+# ball prediction markers
+PREDICTION_MARKER_INTERVAL = 0.1  # seconds
+PREDICTION_COLOR = np.array([1, 0.9, 0.3, 0.6])
+
 # box mesh data
 box_verts = np.array([
     [-0.5, -0.5, -0.5],
@@ -68,6 +79,26 @@ box_colors = np.array([
     [1, 1, 1, 1],
 ])
 
+# replay/sim playback controls
+MIN_PLAYBACK_SPEED = 0.25
+MAX_PLAYBACK_SPEED = 64
+SEEK_SECONDS = 5
+
+# rocketsim uses a left-handed coordinate system, we mirror the x axis when rendering
+mirror_x = np.array([-1, 1, 1])
+mirror_x_rot = np.outer(mirror_x, mirror_x)  # elementwise factor for mirrored rotation matrices
+
+# axis item lines and colors, same as GLAxisItem
+axis_verts = np.array([
+    [0, 0, 0], [0, 0, 1],
+    [0, 0, 0], [0, 1, 0],
+    [0, 0, 0], [1, 0, 0]])
+
+axis_colors = np.array([
+    [0, 1, 0, .6], [0, 1, 0, .6],
+    [1, 1, 0, .6], [1, 1, 0, .6],
+    [0, 0, 1, .6], [0, 0, 1, .6]])
+
 
 # set all np arrays above to read-only
 for var_name in dir():
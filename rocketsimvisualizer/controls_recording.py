@@ -0,0 +1,129 @@
+from rocketsimvisualizer.generic_controller import GenericController, set_controls_from_array
+from rocketsimvisualizer.recording import FILE_HEADER, dtype_from_descr
+from rocketsimvisualizer.snapshot import control_names
+
+import RocketSim as rs
+import numpy as np
+
+import json
+
+# File layout: magic, header size, json header (version, tick rate, dtype), then fixed size records
+# of the controls applied to a car and the tick they were applied at, in the order they were applied.
+CONTROLS_MAGIC = b"RSVCTL01"
+CONTROLS_VERSION = 1
+
+controls_record_dtype = np.dtype([
+    ("tick_count", "<u8"),
+    ("car_id", "<u4"),
+    ("controls", "<f4", len(control_names)),
+])
+
+
+class ControlsRecorder:
+    def __init__(self, path, tick_rate=None, buffer_size=1024):
+        self.path = path
+        self.file = open(path, "wb")
+        self.records = np.zeros(buffer_size, dtype=controls_record_dtype)
+        self.buffer_len = 0
+        self.num_records = 0
+
+        header = json.dumps({
+            "version": CONTROLS_VERSION,
+            "tick_rate": tick_rate,
+            "dtype": controls_record_dtype.descr,
+        }).encode()
+        self.file.write(FILE_HEADER.pack(CONTROLS_MAGIC, len(header)))
+        self.file.write(header)
+
+    def record(self, tick_count, car_id, controls):
+        record = self.records[self.buffer_len]
+        record["tick_count"] = tick_count
+        record["car_id"] = car_id
+        record["controls"] = [getattr(controls, name) for name in control_names]
+        self.buffer_len += 1
+        self.num_records += 1
+
+        if self.buffer_len == len(self.records):
+            self.flush()
+
+    def flush(self):
+        if self.buffer_len == 0:
+            return
+        self.file.write(self.records[:self.buffer_len].tobytes())
+        self.file.flush()
+        self.buffer_len = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_controls_recording(path):
+    with open(path, "rb") as file:
+        data = file.read()
+
+    magic, header_size = FILE_HEADER.unpack_from(data, 0)
+    if magic != CONTROLS_MAGIC:
+        raise ValueError(f"{path} is not a controls recording")
+
+    header_offset = FILE_HEADER.size
+    header = json.loads(data[header_offset:header_offset + header_size])
+    if header["version"] > CONTROLS_VERSION:
+        raise ValueError(f"{path} was recorded with a newer format version {header['version']}")
+
+    dtype = dtype_from_descr(header["dtype"])
+    offset = header_offset + header_size
+    num_records = (len(data) - offset) // dtype.itemsize  # a partially written last record is dropped
+    records = np.frombuffer(data, dtype, count=num_records, offset=offset)
+    return header, records
+
+
+# Feeds recorded controls back into an arena at the exact ticks they were applied at. The arena should
+# be set up the same way as the recorded one (same cars added in the same order, same kickoff), and
+# the visualizer used with step_arena=True, threaded_sim=False and overwrite_controls=False so that
+# every step goes through step_arena below. Visualizer creates controllers with only the input dict,
+# so pass it as controller_class=functools.partial(ControlsReplayController, path=...).
+class ControlsReplayController(GenericController):
+    def __init__(self, input_dict=None, path=None, records=None):
+        super().__init__(input_dict or {})
+        self.header = None  # only known when reading from a file
+        if records is None:
+            self.header, records = read_controls_recording(path)
+        self.records = records
+        self.ticks = records["tick_count"].astype(np.int64)
+        self.position = 0
+        self.replay_controls = rs.CarControls()
+
+    @property
+    def finished(self):
+        return self.position >= len(self.records)
+
+    def apply_due(self, arena):
+        # apply every record up to the arena's current tick
+        tick_count = arena.tick_count
+        while self.position < len(self.records) and self.ticks[self.position] <= tick_count:
+            record = self.records[self.position]
+            car = arena.get_car_from_id(int(record["car_id"]), None)
+            if car:
+                set_controls_from_array(self.replay_controls, record["controls"])
+                car.set_controls(self.replay_controls)
+            self.position += 1
+
+    def step_arena(self, arena, num_ticks):
+        # split the step at every tick that has recorded controls so they're applied at the same tick
+        end_tick = arena.tick_count + num_ticks
+        self.apply_due(arena)
+        while arena.tick_count < end_tick:
+            next_tick = end_tick
+            if self.position < len(self.records):
+                next_tick = min(int(self.ticks[self.position]), end_tick)
+            arena.step(max(next_tick - arena.tick_count, 1))
+            self.apply_due(arena)
@@ -0,0 +1,132 @@
+import time
+
+MAX_CATCHUP_FRAMES = 4  # frames of arena steps made up for at once, anything past that is skipped
+MIN_SIM_SPEED = 0.25
+MAX_SIM_SPEED = 64
+STEP_TIME_BUDGET = 0.8  # fraction of a frame that can be spent stepping above real time
+THROUGHPUT_SMOOTHING = 0.1
+
+
+# Decides when the next frame starts and how many frames worth of arena steps are due, so the
+# arena keeps running in real time when frames are late or rendered at a lower rate while idle.
+# The caller waits on a coarse timer until about a millisecond before the frame and wait() sleeps
+# the rest, which keeps timing precise without spinning.
+class FrameScheduler:
+    def __init__(self, fps=60, max_catchup_frames=MAX_CATCHUP_FRAMES):
+        self.frame_dt = 1 / fps
+        self.max_catchup_frames = max_catchup_frames
+        self.next_frame_time = time.perf_counter()
+        self.step_time = self.next_frame_time  # time the arena has been stepped up to
+        self.skipped_frames = 0
+
+    def reset(self):
+        self.next_frame_time = self.step_time = time.perf_counter()
+
+    def set_fps(self, fps):
+        self.frame_dt = 1 / fps
+
+    def time_until_next_frame(self):
+        return self.next_frame_time - time.perf_counter()
+
+    def wait(self):
+        delay = self.time_until_next_frame()
+        if delay > 0:
+            time.sleep(delay)
+
+    def begin_frame(self, render_dt=None):
+        # returns the number of frames worth of arena steps due since the last frame,
+        # render_dt is the time until the next frame, longer than frame_dt when idle
+        if render_dt is None:
+            render_dt = self.frame_dt
+        now = time.perf_counter()
+
+        max_steps = self.max_catchup_frames + int(render_dt / self.frame_dt)
+        steps = int((now - self.step_time) / self.frame_dt + 0.5)
+        if steps > max_steps:
+            self.skipped_frames += steps - max_steps
+            steps = max_steps
+            self.step_time = now
+        else:
+            self.step_time += steps * self.frame_dt
+
+        # when behind, start the next frame right away instead of trying to make up the time
+        self.next_frame_time = max(self.next_frame_time + render_dt, now)
+        return steps
+
+
+# Decides how many arena ticks each frame steps when the visualizer steps the arena itself.
+# speed is a multiple of real time, None for unlimited. Ticks above real time are capped by how many
+# ticks the measured physics throughput can step in STEP_TIME_BUDGET of a frame, so high speeds are
+# limited by the physics instead of piling up frames the render loop can't keep up with.
+class SimClock:
+    def __init__(self, tick_skip, speed=1.0):
+        self.tick_skip = tick_skip  # ticks per frame at 1x
+        self.speed = speed
+        self.last_speed = 1.0 if speed is None else speed  # restored when leaving unlimited
+        self.paused = False
+        self.pending_ticks = 0  # single steps requested while paused
+        self.tick_accumulator = 0.0  # fractional ticks carried over to the next frame
+        self.ticks_per_second = None  # physics throughput, measured while stepping
+        self.last_ticks = 0
+
+    def set_speed(self, speed):
+        if speed is not None:
+            speed = min(max(speed, MIN_SIM_SPEED), MAX_SIM_SPEED)
+            self.last_speed = speed
+        self.speed = speed
+        self.tick_accumulator = 0.0
+
+    def speed_up(self):
+        if self.speed is not None:
+            self.set_speed(self.speed * 2)
+
+    def slow_down(self):
+        self.set_speed(MAX_SIM_SPEED if self.speed is None else self.speed / 2)
+
+    def toggle_unlimited(self):
+        self.set_speed(self.last_speed if self.speed is None else None)
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def step(self):
+        self.paused = True
+        self.pending_ticks += self.tick_skip
+
+    def get_ticks_per_step(self):
+        # for sim threads, so they publish about one state per frame at any speed
+        speed = MAX_SIM_SPEED if self.speed is None else self.speed
+        return max(self.tick_skip, round(self.tick_skip * speed))
+
+    def get_ticks(self, num_frames, frame_dt):
+        if self.paused:
+            ticks, self.pending_ticks = self.pending_ticks, 0
+        else:
+            max_ticks = self.tick_skip * MAX_SIM_SPEED * num_frames
+            if self.ticks_per_second is not None:
+                max_ticks = max(int(self.ticks_per_second * frame_dt * STEP_TIME_BUDGET), self.tick_skip * num_frames)
+
+            if self.speed is None:
+                ticks = max_ticks
+            else:
+                self.tick_accumulator += self.tick_skip * num_frames * self.speed
+                ticks = int(self.tick_accumulator)
+                self.tick_accumulator -= ticks
+                if ticks > max_ticks:
+                    ticks = max_ticks
+                    self.tick_accumulator = 0.0
+        self.last_ticks = ticks
+        return ticks
+
+    def add_step_time(self, num_ticks, duration):
+        if num_ticks <= 0 or duration <= 0:
+            return
+        if self.ticks_per_second is None:
+            self.ticks_per_second = num_ticks / duration
+        else:
+            self.ticks_per_second += (num_ticks / duration - self.ticks_per_second) * THROUGHPUT_SMOOTHING
+
+    def get_label(self):
+        speed = "unlimited" if self.speed is None else f"{self.speed:g}x"
+        paused = " (paused)" if self.paused else ""
+        return f"{speed}{paused}"
@@ -1,21 +1,129 @@
+from rocketsimvisualizer.snapshot import control_names
+
 import RocketSim as rs
+import numpy as np
+
+import time
+
+# input actions that control replay playback or the simulation speed
+playback_actions = ("PAUSE", "SPEED_UP", "SLOW_DOWN", "REVERSE", "SEEK_FORWARD", "SEEK_BACKWARD", "STEP", "UNLIMITED")
+
+THROTTLE, STEER, PITCH, YAW, ROLL, BOOST, JUMP, HANDBRAKE = range(len(control_names))
+
+# how much every bound action adds to each control, scaled by the input value (0-1 for buttons,
+# -1 to 1 for sticks). Actions can be inverted by prefixing them with "-" in the config.
+action_slots = {
+    "FORWARD": ((THROTTLE, 1), (PITCH, -1)),
+    "BACKWARD": ((THROTTLE, -1), (PITCH, 1)),
+    "RIGHT": ((STEER, 1), (YAW, 1)),
+    "LEFT": ((STEER, -1), (YAW, -1)),
+    "ROLL_RIGHT": ((ROLL, 1),),
+    "ROLL_LEFT": ((ROLL, -1),),
+    "THROTTLE": ((THROTTLE, 1),),
+    "STEER": ((STEER, 1), (YAW, 1)),
+    "PITCH": ((PITCH, 1),),
+    "YAW": ((YAW, 1),),
+    "ROLL": ((ROLL, 1),),
+    "JUMP": ((JUMP, 1),),
+    "POWERSLIDE": ((HANDBRAKE, 1),),
+    "BOOST": ((BOOST, 1),),
+}
 
 
+def set_controls_from_array(controls, values):
+    throttle, steer, pitch, yaw, roll = np.clip(values[:BOOST], -1, 1).tolist()
+    controls.throttle = throttle
+    controls.steer = steer
+    controls.pitch = pitch
+    controls.yaw = yaw
+    controls.roll = roll
+    controls.boost = bool(values[BOOST] > 0)
+    controls.jump = bool(values[JUMP] > 0)
+    controls.handbrake = bool(values[HANDBRAKE] > 0)
+
+
+def set_controls_from_batch(controls_list, values):
+    # values is an (n, 8) array, converted to python floats/bools in one pass instead of per car
+    axes = np.clip(values[:, :BOOST], -1, 1).tolist()
+    buttons = (values[:, BOOST:] > 0).tolist()
+    for controls, (throttle, steer, pitch, yaw, roll), (boost, jump, handbrake) in zip(controls_list, axes, buttons):
+        controls.throttle = throttle
+        controls.steer = steer
+        controls.pitch = pitch
+        controls.yaw = yaw
+        controls.roll = roll
+        controls.boost = boost
+        controls.jump = jump
+        controls.handbrake = handbrake
+
+
+# Inputs (keys, buttons, axes) are mapped to actions by input_dict. Every input has a slot in
+# input_values, and the control values are input_values @ binding_matrix. They're published together
+# with the time of the event that caused them as one tuple, so readers on other threads always get
+# a consistent pair without locking.
 class GenericController:
 
     def __init__(self, input_dict):
         self.input_dict = input_dict
-        self.is_pressed_dict = {input_key: False for input_key in self.input_dict.values()}
+
+        self.input_index = {}  # input name -> slot in input_values
+        self.binding_matrix = np.zeros((len(input_dict), len(control_names)))
+        self.press_actions = {}  # slot -> action triggered when the input is pressed
+        for i, (input_name, action) in enumerate(input_dict.items()):
+            self.input_index[input_name] = i
+            sign = -1 if action.startswith("-") else 1
+            action = action.lstrip("-")
+            if action in action_slots:
+                for slot, factor in action_slots[action]:
+                    self.binding_matrix[i, slot] += sign * factor
+            else:
+                self.press_actions[i] = action
+
+        self.input_values = np.zeros(len(input_dict))
+        self.state = (np.zeros(len(control_names)), 0.0)  # control values, event time
         self.controls = rs.CarControls()
+        self.controls_event_time = 0.0  # time of the newest event in the last get_controls()
+
+    def set_input(self, index, value):
+        # called by the event source, publish() makes the new values visible
+        was_pressed = self.input_values[index] > 0.5
+        self.input_values[index] = value
+        if value > 0.5 and not was_pressed and index in self.press_actions:
+            self.handle_action(self.press_actions[index])
+
+    def publish(self, event_time=None):
+        if event_time is None:
+            event_time = time.perf_counter()
+        self.state = (self.input_values @ self.binding_matrix, event_time)
+
+    def handle_action(self, action):
+        if action == "TARGET_CAM":
+            self.toggle_target_cam()
+        elif action == "FREE_CAM":
+            self.toggle_free_cam()
+        elif action == "SWITCH_CAR":
+            self.switch_car()
+        elif action == "SWITCH_TARGET":
+            self.switch_target()
+        elif action in playback_actions:
+            self.playback_action(action)
 
     def reset_controls(self):
-        for key in self.is_pressed_dict.keys():
-            self.is_pressed_dict[key] = False
-        self.controls = rs.CarControls()
+        self.input_values[:] = 0
+        self.publish()
+
+    def get_state(self):
+        return self.state
 
     def get_controls(self):
+        values, self.controls_event_time = self.get_state()
+        set_controls_from_array(self.controls, values)
         return self.controls
 
+    def step_arena(self, arena, num_ticks):
+        # overridden by controllers that apply controls in the middle of a step
+        arena.step(num_ticks)
+
     # These methods will be overwritten later
     @classmethod
     def switch_car():
@@ -32,3 +140,7 @@ class GenericController:
     @classmethod
     def toggle_free_cam():
         raise NotImplementedError
+
+    @classmethod
+    def playback_action(action):
+        raise NotImplementedError
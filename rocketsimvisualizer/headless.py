@@ -0,0 +1,147 @@
+from rocketsimvisualizer.replay import ReplayPlayer
+
+import numpy as np
+
+import subprocess
+import pathlib
+import time
+import os
+
+video_extensions = (".mp4", ".mkv", ".webm", ".avi", ".mov", ".gif")
+
+
+def get_ffmpeg_cmd(path, width, height, fps):
+    return ["ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            "-pix_fmt", "yuv420p", str(path)]
+
+
+class PNGWriter:
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.frame_index = 0
+
+    def write(self, image):
+        image.save(str(self.path / f"frame_{self.frame_index:06d}.png"))
+        self.frame_index += 1
+
+    def close(self):
+        pass
+
+
+# pipes raw rgb frames to an encoder process, ffmpeg by default
+class PipeWriter:
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, image):
+        from pyqtgraph.Qt import QtGui
+        import pyqtgraph as pg
+
+        image = image.convertToFormat(QtGui.QImage.Format.Format_RGB888)
+        frame = pg.functions.ndarray_from_qimage(image)
+        self.process.stdin.write(np.ascontiguousarray(frame).tobytes())
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+# Renders an arena or a source like ReplayPlayer without a display, as fast as possible.
+# Uses the Qt offscreen platform unless QT_QPA_PLATFORM is already set, software_gl makes
+# Mesa use its software rasterizer for machines without a GPU.
+class HeadlessRenderer:
+    def __init__(
+        self, arena=None,
+        output="frames",
+        every_n_ticks=1,
+        size=(1280, 720),
+        video_fps=60,
+        encoder_cmd: list = None,
+        software_gl=False,
+        **kwargs):
+
+        if "tick_skip" in kwargs:
+            raise TypeError("HeadlessRenderer steps the arena by every_n_ticks, pass that instead of tick_skip")
+
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        if software_gl:
+            os.environ["LIBGL_ALWAYS_SOFTWARE"] = "1"
+
+        from rocketsimvisualizer.visualizer import Visualizer
+
+        self.every_n_ticks = every_n_ticks
+        self.source = kwargs.get("source", None)
+        if isinstance(self.source, ReplayPlayer):
+            self.source.pause()  # stepped manually instead of following the wall clock
+
+        # kwargs are passed to Visualizer, the arena is stepped every_n_ticks ticks per frame
+        kwargs.setdefault("step_arena", arena is not None)
+        kwargs["threaded_sim"] = False
+        self.visualizer = Visualizer(arena, tick_skip=every_n_ticks, **kwargs)
+        self.visualizer.w.resize(*size)
+
+        # frames go to a png sequence in the output folder, or to an encoder for video files
+        if encoder_cmd is not None:
+            self.writer = PipeWriter(encoder_cmd)
+        elif str(output).lower().endswith(video_extensions):
+            self.writer = PipeWriter(get_ffmpeg_cmd(output, *size, video_fps))
+        else:
+            self.writer = PNGWriter(output)
+
+        self.num_frames = 0
+        self.render_time = 0
+
+    @property
+    def finished(self):
+        player = self.source
+        return isinstance(player, ReplayPlayer) and player.record_index >= player.num_records - 1
+
+    def render_frame(self):
+        v = self.visualizer
+        if isinstance(self.source, ReplayPlayer) and self.num_frames > 0:
+            self.source.step(max(round(self.every_n_ticks / self.source.ticks_per_record), 1))
+
+        v.update()
+        image = v.w.grabFramebuffer()
+        self.writer.write(image)
+        self.num_frames += 1
+
+    def render(self, num_frames: int = None, progress=None, report_interval=1.0):
+        # renders until num_frames or the end of a replay, returns throughput stats.
+        # progress is called with (frames, fps) every report_interval seconds
+        if num_frames is None and not isinstance(self.source, ReplayPlayer):
+            raise ValueError("num_frames is needed unless rendering a replay, a live arena never finishes")
+
+        t0 = report_t0 = time.perf_counter()
+        report_frames = 0
+
+        while num_frames is None or self.num_frames < num_frames:
+            self.render_frame()
+            report_frames += 1
+
+            now = time.perf_counter()
+            if progress is not None and now - report_t0 >= report_interval:
+                progress(self.num_frames, report_frames / (now - report_t0))
+                report_t0 = now
+                report_frames = 0
+
+            if self.finished:
+                break
+
+        self.render_time += time.perf_counter() - t0
+        return self.stats()
+
+    def stats(self):
+        return {
+            "frames": self.num_frames,
+            "seconds": self.render_time,
+            "fps": self.num_frames / self.render_time if self.render_time > 0 else 0,
+        }
+
+    def close(self):
+        self.writer.close()
+        if self.source is not None and hasattr(self.source, "close"):
+            self.source.close()
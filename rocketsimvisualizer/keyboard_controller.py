@@ -31,27 +31,9 @@ class KeyboardController(GenericController):
         if event.isAutoRepeat():
             return
 
-        key = keys_mapping[event.key()]
-        if key in self.input_dict.keys():
-            self.is_pressed_dict[self.input_dict[key]] = is_pressed
-
-        if self.input_dict.get(key, None) == "TARGET_CAM" and is_pressed:
-            self.toggle_target_cam()
-
-        if self.input_dict.get(key, None) == "FREE_CAM" and is_pressed:
-            self.toggle_free_cam()
-
-        if self.input_dict.get(key, None) == "SWITCH_CAR" and is_pressed:
-            self.switch_car()
-
-        if self.input_dict.get(key, None) == "SWITCH_TARGET" and is_pressed:
-            self.switch_target()
-
-        self.controls.throttle = self.is_pressed_dict["FORWARD"] - self.is_pressed_dict["BACKWARD"]
-        self.controls.steer = self.is_pressed_dict["RIGHT"] - self.is_pressed_dict["LEFT"]
-        self.controls.roll = self.is_pressed_dict["ROLL_RIGHT"] - self.is_pressed_dict["ROLL_LEFT"]
-        self.controls.pitch = -self.controls.throttle
-        self.controls.yaw = self.controls.steer
-        self.controls.jump = self.is_pressed_dict["JUMP"]
-        self.controls.handbrake = self.is_pressed_dict["POWERSLIDE"]
-        self.controls.boost = self.is_pressed_dict["BOOST"]
+        index = self.input_index.get(keys_mapping[event.key()], None)
+        if index is None:
+            return
+
+        self.set_input(index, float(is_pressed))
+        self.publish()
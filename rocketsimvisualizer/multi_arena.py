@@ -0,0 +1,71 @@
+from rocketsimvisualizer.snapshot import ArenaSnapshot, ArenaLayout
+from rocketsimvisualizer.transforms import get_hitbox_transform, set_car_models, mirror_x
+
+import numpy as np
+
+import colorsys
+import math
+
+TILE_MARGIN = 1000
+
+
+def get_arena_tints(num_arenas):
+    # evenly spaced hues, one per arena
+    return np.array([(*colorsys.hsv_to_rgb(i / num_arenas, 0.6, 1), 1) for i in range(num_arenas)])
+
+
+def get_tile_offsets(num_arenas, tile_size, columns=None):
+    # arena 0 stays at the origin, the others are laid out in a grid towards +x and -y
+    if columns is None:
+        columns = math.ceil(math.sqrt(num_arenas))
+    indices = np.arange(num_arenas)
+    offsets = np.zeros((num_arenas, 3))
+    offsets[:, 0] = (indices % columns) * (tile_size[0] + TILE_MARGIN)
+    offsets[:, 1] = -(indices // columns) * (tile_size[1] + TILE_MARGIN)
+    return offsets
+
+
+# Dynamic objects of one additional arena in a multi-arena view, the static field is shared
+class ArenaTile:
+    def __init__(self, arena, tint, offset):
+        self.arena = arena
+        self.tint = tint
+        self.offset = offset  # world space offset, zero when overlaid
+        self.snapshot = ArenaSnapshot()
+        self.sim_thread = None  # the visualizer's SimThread when it steps this arena too
+        self.sim_index = None  # index of this arena in the sim thread
+
+        self.car_ids = None
+        self.car_models = np.zeros((0, 4, 4))
+        self.hitbox_transforms = np.zeros((0, 4, 4))
+        self.car_teams = np.zeros(0, dtype=int)
+        self.ball_model = np.eye(4)
+
+    def update_snapshot(self, interpolate=True):
+        if self.sim_thread is not None:
+            self.sim_thread.read_snapshot(self.snapshot, interpolate, self.sim_index)
+        else:
+            self.snapshot.update(self.arena, read_pads=False)
+
+    def init_cars(self):
+        # with a sim thread the layout comes with the snapshot, the arena may be mid-step
+        if self.sim_thread is not None:
+            cars = (self.snapshot.layout or self.sim_thread.layouts[self.sim_index]).cars
+        else:
+            cars = ArenaLayout.from_arena(self.arena).cars
+        self.car_ids = [car["id"] for car in cars]
+        self.car_models = np.tile(np.eye(4), (len(cars), 1, 1))
+        self.hitbox_transforms = np.array([get_hitbox_transform(car) for car in cars]).reshape(-1, 4, 4)
+        self.car_teams = np.array([car["team"] for car in cars], dtype=int)
+
+    def get_hitbox_models(self):
+        if self.snapshot.car_ids != self.car_ids:
+            self.init_cars()
+
+        set_car_models(self.car_models, self.snapshot.cars)
+        self.car_models[:, :3, 3] += self.offset
+        return self.car_models @ self.hitbox_transforms
+
+    def get_ball_model(self):
+        self.ball_model[:3, 3] = self.snapshot.ball["pos"] * mirror_x + self.offset
+        return self.ball_model
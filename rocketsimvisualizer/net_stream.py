@@ -0,0 +1,434 @@
+from rocketsimvisualizer.snapshot import ArenaSnapshot, ArenaLayout, ball_dtype, car_dtype, pad_dtype
+
+import numpy as np
+
+from collections import deque
+import threading
+import socket
+import struct
+import json
+import time
+import zlib
+import os
+
+# Every message is a frame header followed by a zlib compressed payload:
+#   layout frames (kind L) carry the json arena layout
+#   key frames (kind K) carry the packed ball, cars and pads of one snapshot
+#   delta frames (kind D) carry the packed snapshot xored with the one of frame base_seq,
+#       unchanged bytes become zeros which compress to almost nothing
+# TCP and Unix socket publishers listen for viewers, UDP publishers send datagrams to a listening viewer.
+FRAME_MAGIC = b"RSVN"
+FRAME_HEADER = struct.Struct("<4s1s3xIIQIII")  # magic, kind, seq, base seq, tick, num cars, num pads, payload size
+
+LAYOUT_FRAME = b"L"
+KEY_FRAME = b"K"
+DELTA_FRAME = b"D"
+
+DEFAULT_ADDRESS = "tcp://127.0.0.1:47600"
+KEYFRAME_INTERVAL = 120  # frames between key frames, also how often UDP viewers get the layout
+MAX_DATAGRAM_SIZE = 65507
+SEND_TIMEOUT = 5.0  # seconds before a viewer that stopped reading is disconnected
+RATE_WINDOW = 1.0  # seconds the bandwidth is averaged over
+
+
+def parse_address(address):
+    # "tcp://host:port", "udp://host:port" or "unix:///path/to/socket"
+    scheme, _, location = address.partition("://")
+    if scheme == "unix":
+        return scheme, socket.AF_UNIX, location
+    if scheme in ("tcp", "udp"):
+        host, _, port = location.rpartition(":")
+        return scheme, socket.AF_INET, (host or "127.0.0.1", int(port))
+    raise ValueError(f"Unknown stream address {address}, expected tcp://, udp:// or unix://")
+
+
+def pack_state(snapshot):
+    return np.concatenate((
+        snapshot.ball.reshape(1).view(np.uint8),
+        snapshot.cars.view(np.uint8),
+        snapshot.pads.view(np.uint8),
+    ))
+
+
+def get_state_size(num_cars, num_pads):
+    return ball_dtype.itemsize + num_cars * car_dtype.itemsize + num_pads * pad_dtype.itemsize
+
+
+def recv_exact(sock, size):
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("Stream closed")
+        received += n
+    return bytes(data)
+
+
+class RateCounter:
+    def __init__(self):
+        self.total = 0
+        self.window_start = time.perf_counter()
+        self.window_total = 0
+        self.rate = 0.0  # per second over the last full window
+
+    def add(self, amount):
+        self.total += amount
+        now = time.perf_counter()
+        if now - self.window_start >= RATE_WINDOW:
+            self.rate = (self.total - self.window_total) / (now - self.window_start)
+            self.window_start = now
+            self.window_total = self.total
+
+
+# Sends arena snapshots to viewers over the network. publish() only packs, delta encodes and queues
+# the frame, a background thread does the sending. When viewers can't keep up the oldest queued
+# frames are dropped and the next frame is sent as a key frame so the deltas stay consistent.
+class StreamPublisher:
+    def __init__(self, address=DEFAULT_ADDRESS, queue_size=8, keyframe_interval=KEYFRAME_INTERVAL, compression_level=1):
+        self.address = address
+        self.scheme, family, self.sock_address = parse_address(address)
+        self.keyframe_interval = keyframe_interval
+        self.compression_level = compression_level
+
+        self.queue = deque()
+        self.queue_size = queue_size
+        self.queue_event = threading.Event()
+        self.running = True
+
+        self.clients = []  # only used by the sender thread
+        self.pending_clients = []  # accepted, added to clients with the next layout frame
+        if self.scheme == "udp":
+            self.sock = socket.socket(family, socket.SOCK_DGRAM)
+        else:
+            if self.scheme == "unix" and os.path.exists(self.sock_address):
+                os.unlink(self.sock_address)
+            self.sock = socket.socket(family, socket.SOCK_STREAM)
+            if family == socket.AF_INET:
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind(self.sock_address)
+            self.sock.listen()
+            self.sock.settimeout(0.1)
+            self.accept_thread = threading.Thread(target=self.accept_clients, daemon=True)
+            self.accept_thread.start()
+
+        self.sender_thread = threading.Thread(target=self.send_frames, daemon=True)
+        self.sender_thread.start()
+
+        self.snapshot = ArenaSnapshot()
+        self.layout = None
+        self.layout_data = None
+        self.last_state = None
+        self.seq = 0
+        self.force_keyframe = True
+
+        self.frames_dropped = 0
+        self.frames_too_large = 0  # UDP frames over the datagram size limit, never sent
+        self.keyframes = 0
+        self.error = None  # set when the sender thread stopped
+        self.raw_bytes = RateCounter()
+        self.sent_bytes = RateCounter()
+
+    @property
+    def viewer_attached(self):
+        return self.scheme == "udp" or bool(self.clients) or bool(self.pending_clients)
+
+    def accept_clients(self):
+        while self.running:
+            try:
+                client, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            client.settimeout(SEND_TIMEOUT)
+            self.pending_clients.append(client)
+
+    def set_layout(self, layout):
+        self.layout = layout
+        self.layout_data = zlib.compress(json.dumps(layout.to_dict()).encode(), self.compression_level)
+        self.force_keyframe = True
+
+    def publish(self, arena):
+        if not self.viewer_attached:
+            return False
+
+        self.snapshot.update(arena)
+        layout = self.layout
+        if layout is None or self.snapshot.car_ids != layout.car_ids or len(self.snapshot.pads) != len(layout.pads):
+            self.set_layout(ArenaLayout.from_arena(arena))
+        self.publish_snapshot(self.snapshot)
+        return True
+
+    def publish_snapshot(self, snapshot, layout=None):
+        if layout is not None and layout is not self.layout:
+            self.set_layout(layout)
+        if self.layout is None:
+            raise ValueError("The first published snapshot needs a layout")
+        if self.error is not None:
+            raise RuntimeError(f"Stream sender stopped: {self.error}")
+
+        state = pack_state(snapshot)
+        self.raw_bytes.add(len(state))
+
+        # new viewers and UDP viewers that missed it need the layout, which always comes with a key frame
+        joining_clients = []
+        if self.pending_clients:
+            joining_clients, self.pending_clients = self.pending_clients, []
+
+        self.seq += 1
+        periodic = self.seq % self.keyframe_interval == 0
+        send_layout = self.force_keyframe or bool(joining_clients) or self.scheme == "udp" and periodic
+
+        last_state = self.last_state
+        if send_layout or periodic or last_state is None or len(last_state) != len(state):
+            kind, base_seq, payload = KEY_FRAME, 0, state
+            self.keyframes += 1
+        else:
+            kind, base_seq, payload = DELTA_FRAME, self.seq - 1, np.bitwise_xor(state, last_state)
+        self.last_state = state
+        self.force_keyframe = False
+
+        payload = zlib.compress(payload.tobytes(), self.compression_level)
+        frame = FRAME_HEADER.pack(FRAME_MAGIC, kind, self.seq, base_seq, snapshot.tick_count,
+            len(snapshot.cars), len(snapshot.pads), len(payload)) + payload
+
+        layout_frame = None
+        if send_layout:
+            layout_frame = FRAME_HEADER.pack(FRAME_MAGIC, LAYOUT_FRAME, self.seq, 0, snapshot.tick_count,
+                len(snapshot.cars), len(snapshot.pads), len(self.layout_data)) + self.layout_data
+
+        # drop the oldest frames when the sender is behind, viewers then wait for the next key frame
+        while len(self.queue) >= self.queue_size:
+            _, _, dropped_clients = self.queue.popleft()
+            self.pending_clients += dropped_clients
+            self.frames_dropped += 1
+            self.force_keyframe = True
+        self.queue.append((layout_frame, frame, joining_clients))
+        self.queue_event.set()
+
+    def send(self, data):
+        if self.scheme == "udp":
+            if len(data) > MAX_DATAGRAM_SIZE:
+                self.frames_too_large += 1
+                self.force_keyframe = True  # the deltas after it can't be decoded
+                return
+            try:
+                self.sock.sendto(data, self.sock_address)
+            except OSError:
+                return  # nobody is listening yet
+            self.sent_bytes.add(len(data))
+            return
+
+        for client in list(self.clients):
+            try:
+                client.sendall(data)
+            except OSError:
+                self.clients.remove(client)
+                client.close()
+                continue
+            self.sent_bytes.add(len(data))
+
+    def send_frames(self):
+        while self.running:
+            if not self.queue:
+                self.queue_event.wait(0.1)
+                self.queue_event.clear()
+                continue
+
+            layout_frame, frame, joining_clients = self.queue.popleft()
+            self.clients += joining_clients
+            try:
+                if layout_frame is not None:
+                    self.send(layout_frame)
+                self.send(frame)
+            except Exception as e:
+                # publish_snapshot raises this, instead of queueing frames nobody sends
+                self.error = repr(e)
+                self.running = False
+
+    def stats(self):
+        return {
+            "frames": self.seq,
+            "keyframes": self.keyframes,
+            "frames_dropped": self.frames_dropped,
+            "frames_too_large": self.frames_too_large,
+            "queued": len(self.queue),
+            "bytes_sent": self.sent_bytes.total,
+            "bytes_per_second": self.sent_bytes.rate,
+            "compression_ratio": self.raw_bytes.total / max(self.sent_bytes.total, 1),
+            "error": self.error,
+        }
+
+    def close(self):
+        self.running = False
+        self.queue_event.set()
+        self.sender_thread.join()
+        for client in self.clients + self.pending_clients:
+            client.close()
+        self.sock.close()
+        if self.scheme == "unix" and os.path.exists(self.sock_address):
+            os.unlink(self.sock_address)
+
+
+# Visualizer data source receiving from a StreamPublisher. A background thread receives and decodes
+# frames into a bounded queue that drops the oldest states, update_snapshot() shows the newest one.
+class StreamSource:
+    def __init__(self, address=DEFAULT_ADDRESS, queue_size=8, timeout: float = None):
+        self.address = address
+        self.scheme, family, sock_address = parse_address(address)
+
+        t0 = time.time()
+        if self.scheme == "udp":
+            self.sock = socket.socket(family, socket.SOCK_DGRAM)
+            self.sock.bind(sock_address)
+        else:
+            # the publisher might not be up yet
+            while True:
+                self.sock = socket.socket(family, socket.SOCK_STREAM)
+                try:
+                    self.sock.connect(sock_address)
+                    break
+                except OSError:
+                    self.sock.close()
+                    if timeout is not None and time.time() - t0 > timeout:
+                        raise TimeoutError(f"Couldn't connect to {address}")
+                    time.sleep(0.1)
+        self.sock.settimeout(0.1)
+
+        # (seq, tick, num cars, num pads, packed state, layout), every state carries the layout it belongs to
+        # so the render thread never sees a layout before the states that go with it
+        self.queue = deque(maxlen=queue_size)
+        self.running = True
+
+        # only used by the receiver thread
+        self.last_seq = None
+        self.last_state = None
+        self.received_layout = None
+
+        self.layout = None
+        self.received_bytes = RateCounter()
+        self.frames_received = 0
+        self.frames_dropped = 0  # decoded but never shown
+        self.frames_skipped = 0  # deltas against a frame we don't have, until the next key frame
+        self.errors = 0
+        self.error = None  # why the receiver thread stopped
+        self.last_shown_seq = None
+
+        self.receiver_thread = threading.Thread(target=self.receive_frames, daemon=True)
+        self.receiver_thread.start()
+
+        # Visualizer needs the layout right away
+        while self.received_layout is None:
+            if not self.receiver_thread.is_alive() or timeout is not None and time.time() - t0 > timeout:
+                raise TimeoutError(f"No arena was published to {address}")
+            time.sleep(0.01)
+        self.layout = self.received_layout
+
+    def receive_frame(self):
+        if self.scheme == "udp":
+            data = self.sock.recv(MAX_DATAGRAM_SIZE)
+            header, payload = data[:FRAME_HEADER.size], data[FRAME_HEADER.size:]
+        else:
+            header = recv_exact(self.sock, FRAME_HEADER.size)
+            payload = None
+        magic, kind, seq, base_seq, tick_count, num_cars, num_pads, payload_size = FRAME_HEADER.unpack(header)
+        if magic != FRAME_MAGIC:
+            raise ValueError(f"{self.address} is not a rocketsimvisualizer stream")
+        if payload is None:
+            payload = recv_exact(self.sock, payload_size)
+        self.received_bytes.add(len(header) + len(payload))
+        return kind, seq, base_seq, tick_count, num_cars, num_pads, payload
+
+    def receive_frames(self):
+        while self.running:
+            try:
+                self.decode_frame(*self.receive_frame())
+            except socket.timeout:
+                continue
+            except (ValueError, TypeError, struct.error, zlib.error) as e:
+                self.errors += 1
+                self.error = repr(e)
+                # a bad datagram is just dropped like a lost one, a broken byte stream can't be resynced
+                if self.scheme != "udp":
+                    self.running = False
+            except OSError as e:
+                self.errors += 1
+                self.error = repr(e)
+                self.running = False
+
+    def decode_frame(self, kind, seq, base_seq, tick_count, num_cars, num_pads, payload):
+        payload = zlib.decompress(payload)
+        if kind == LAYOUT_FRAME:
+            self.received_layout = ArenaLayout.from_dict(json.loads(payload))
+            return
+        if kind not in (KEY_FRAME, DELTA_FRAME):
+            raise ValueError(f"Unknown frame kind {kind}")
+
+        state = np.frombuffer(payload, dtype=np.uint8)
+        if len(state) != get_state_size(num_cars, num_pads):
+            raise ValueError(f"Frame {seq} has {len(state)} bytes, expected {get_state_size(num_cars, num_pads)}")
+        if self.received_layout is None:
+            return  # UDP viewers wait for the next layout
+        if kind == DELTA_FRAME:
+            if base_seq != self.last_seq or len(state) != len(self.last_state):
+                self.frames_skipped += 1
+                return
+            state = np.bitwise_xor(state, self.last_state)
+        self.last_seq = seq
+        self.last_state = state
+        self.frames_received += 1
+
+        if len(self.queue) == self.queue.maxlen:
+            self.frames_dropped += 1
+        self.queue.append((seq, tick_count, num_cars, num_pads, state, self.received_layout))
+
+    def update_snapshot(self, snapshot):
+        if not self.queue:
+            return
+
+        # show the newest state, everything older would only add latency
+        latest = self.queue.pop()
+        dropped = len(self.queue)
+        self.queue.clear()
+        self.frames_dropped += dropped
+
+        seq, tick_count, num_cars, num_pads, state, self.layout = latest
+        snapshot.resize(num_cars, num_pads)
+        snapshot.tick_count = tick_count
+        snapshot.time = time.perf_counter()
+        offset = ball_dtype.itemsize
+        cars_end = offset + num_cars * car_dtype.itemsize
+        snapshot.ball[...] = state[:offset].view(ball_dtype)[0]
+        snapshot.cars[:] = state[offset:cars_end].view(car_dtype)
+        snapshot.pads[:] = state[cars_end:cars_end + num_pads * pad_dtype.itemsize].view(pad_dtype)
+        snapshot.update_car_index()
+        snapshot.ball_state = None
+        snapshot.car_states = []
+        self.last_shown_seq = seq
+
+    def stats(self):
+        return {
+            "frames_received": self.frames_received,
+            "frames_dropped": self.frames_dropped,
+            "frames_skipped": self.frames_skipped,
+            "bytes_received": self.received_bytes.total,
+            "bytes_per_second": self.received_bytes.rate,
+            "errors": self.errors,
+            "error": self.error,
+            "connected": self.running,
+        }
+
+    def close(self):
+        self.running = False
+        self.receiver_thread.join()
+        self.sock.close()
+
+
+def run_viewer(address=DEFAULT_ADDRESS, **kwargs):
+    from rocketsimvisualizer.visualizer import Visualizer
+
+    source = StreamSource(address)
+    Visualizer(source=source, **kwargs).start()
+    source.close()
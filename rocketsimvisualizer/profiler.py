@@ -0,0 +1,122 @@
+import numpy as np
+
+import csv
+import json
+import threading
+import time
+
+PERCENTILES = (50, 95, 99)
+
+
+class ProfilerStage:
+    __slots__ = ("profiler", "name", "t0")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.t0 = 0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *args):
+        self.profiler.add(self.name, time.perf_counter() - self.t0)
+
+
+class NullStage:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+null_stage = NullStage()
+
+
+# Keeps the last `history` timings of every stage in ring buffers.
+# Sim threads share the profiler with the renderer, so the buffers are only touched under the lock.
+class FrameProfiler:
+    def __init__(self, enabled=True, history=600):
+        self.enabled = enabled
+        self.history = history
+        self.samples = {}  # stage name -> ring buffer of durations in seconds
+        self.counts = {}  # stage name -> total number of samples
+        self.stages = {}
+        self.lock = threading.RLock()
+
+    def measure(self, name):
+        # use as `with profiler.measure("name"):`
+        if not self.enabled:
+            return null_stage
+        stage = self.stages.get(name, None)
+        if stage is None:
+            stage = self.stages[name] = ProfilerStage(self, name)
+        return stage
+
+    def add(self, name, duration):
+        if not self.enabled:
+            return
+        with self.lock:
+            samples = self.samples.get(name, None)
+            if samples is None:
+                self.counts[name] = 0
+                samples = self.samples[name] = np.zeros(self.history)
+            samples[self.counts[name] % self.history] = duration
+            self.counts[name] += 1
+
+    def get_samples(self, name):
+        with self.lock:
+            return self.samples[name][:min(self.counts[name], self.history)].copy()
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.counts.clear()
+
+    def stats(self, name):
+        with self.lock:
+            samples = self.get_samples(name)
+            count = self.counts[name]
+        stats = {"count": count, "mean": float(samples.mean()), "max": float(samples.max())}
+        for p, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+            stats[f"p{p}"] = float(value)
+        return stats
+
+    def summary(self):
+        # the lock is reentrant, holding it throughout keeps a reset() from removing stages mid-way
+        with self.lock:
+            return {name: self.stats(name) for name in self.samples}
+
+    def histogram(self, name="frame", bins=20):
+        counts, edges = np.histogram(self.get_samples(name), bins=bins)
+        return counts.tolist(), edges.tolist()
+
+    def overlay_lines(self):
+        lines = ["stage: mean / p50 / p95 / p99 ms"]
+        for name, stats in self.summary().items():
+            values = " / ".join(f"{stats[key] * 1000:.2f}" for key in ("mean", "p50", "p95", "p99"))
+            lines.append(f"{name}: {values}")
+        return lines
+
+    def dump_csv(self, path):
+        keys = ["count", "mean"] + [f"p{p}" for p in PERCENTILES] + ["max"]
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["stage"] + [key if key == "count" else f"{key}_ms" for key in keys])
+            for name, stats in self.summary().items():
+                writer.writerow([name] + [stats[key] if key == "count" else stats[key] * 1000 for key in keys])
+
+    def dump_json(self, path):
+        data = {"summary": self.summary()}
+        if "frame" in self.samples:
+            counts, edges = self.histogram("frame")
+            data["frame_histogram"] = {"counts": counts, "edges": edges}
+        with open(path, "w") as file:
+            json.dump(data, file, indent=2)
+
+    def dump(self, path):
+        if str(path).endswith(".csv"):
+            self.dump_csv(path)
+        else:
+            self.dump_json(path)
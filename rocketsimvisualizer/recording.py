@@ -0,0 +1,292 @@
+from rocketsimvisualizer.snapshot import ArenaSnapshot, ArenaLayout, ball_dtype, car_dtype, pad_dtype
+
+import numpy as np
+
+import json
+import mmap
+import struct
+import time
+import zlib
+import lzma
+import bz2
+
+# File layout:
+#   file header: magic, header size, json header (version, codec, dtypes)
+#   chunks: chunk header followed by its payload, either a json arena layout (kind L)
+#       or a block of states (kind S), every state chunk uses the last layout before it
+#   index: one entry per chunk, written on close
+#   footer: index offset, number of index entries, magic
+# State payloads are columnar, each field of each dtype is stored as one contiguous array.
+
+FILE_MAGIC = b"RSVREC01"
+FOOTER_MAGIC = b"RSVIDX01"
+FORMAT_VERSION = 1
+
+FILE_HEADER = struct.Struct("<8sI")
+CHUNK_HEADER = struct.Struct("<1s3xIIIQI")  # kind, num records, num cars, num pads, first tick, payload size
+INDEX_ENTRY = struct.Struct("<1s3xIIIQQ")  # kind, num records, num cars, num pads, first tick, chunk offset
+FOOTER = struct.Struct("<QQ8s")
+
+LAYOUT_CHUNK = b"L"
+STATE_CHUNK = b"S"
+
+codecs = {
+    None: (lambda data, level: data, lambda data: data),
+    "zlib": (lambda data, level: zlib.compress(data, 1 if level is None else level), zlib.decompress),
+    "lzma": (lambda data, level: lzma.compress(data, preset=0 if level is None else level), lzma.decompress),
+    "bz2": (lambda data, level: bz2.compress(data, 9 if level is None else level), bz2.decompress),
+}
+
+
+def pack_columns(arrays):
+    # arrays are structured numpy arrays, output is every field of every array back to back
+    return b"".join(np.ascontiguousarray(array[name]).tobytes()
+        for array in arrays for name in array.dtype.names)
+
+
+def unpack_columns(data, arrays):
+    # inverse of pack_columns, fills the preallocated structured arrays in place
+    offset = 0
+    for array in arrays:
+        for name in array.dtype.names:
+            column = array[name]
+            size = column.nbytes
+            column[...] = np.frombuffer(data, column.dtype, count=column.size, offset=offset).reshape(column.shape)
+            offset += size
+
+
+def dtype_from_descr(descr):
+    # json turns the tuples of dtype.descr into lists
+    return np.dtype([tuple(field[:2]) + tuple(tuple(shape) for shape in field[2:]) for field in descr])
+
+
+def copy_fields(dst, src):
+    # copy the fields both structured arrays have in common, so older recordings stay readable
+    for name in src.dtype.names:
+        if name in dst.dtype.names:
+            dst[name] = src[name]
+
+
+class Recorder:
+    def __init__(self, path, chunk_size=1024, codec="zlib", compression_level=None):
+        if codec not in codecs:
+            raise ValueError(f"Unknown codec {codec}, expected one of {list(codecs)}")
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.codec = codec
+        self.compress = codecs[codec][0]
+        self.compression_level = compression_level
+
+        self.file = open(path, "wb")
+        self.index = []
+        self.num_records = 0
+
+        header = json.dumps({
+            "version": FORMAT_VERSION,
+            "codec": codec,
+            "chunk_size": chunk_size,
+            "ball_dtype": ball_dtype.descr,
+            "car_dtype": car_dtype.descr,
+            "pad_dtype": pad_dtype.descr,
+        }).encode()
+        self.file.write(FILE_HEADER.pack(FILE_MAGIC, len(header)))
+        self.file.write(header)
+
+        self.snapshot = ArenaSnapshot()
+        self.layout = None
+        self.buffer_len = 0
+        self.alloc_buffers(0, 0)
+
+    def alloc_buffers(self, num_cars, num_pads):
+        self.ticks = np.zeros(self.chunk_size, dtype=[("tick_count", np.uint64)])
+        self.balls = np.zeros(self.chunk_size, dtype=ball_dtype)
+        self.cars = np.zeros((self.chunk_size, num_cars), dtype=car_dtype)
+        self.pads = np.zeros((self.chunk_size, num_pads), dtype=pad_dtype)
+
+    def write_chunk(self, kind, num_records, num_cars, num_pads, first_tick, payload):
+        offset = self.file.tell()
+        self.file.write(CHUNK_HEADER.pack(kind, num_records, num_cars, num_pads, first_tick, len(payload)))
+        self.file.write(payload)
+        self.index.append((kind, num_records, num_cars, num_pads, first_tick, offset))
+
+    def set_layout(self, layout):
+        self.flush()
+        self.layout = layout
+        self.alloc_buffers(len(layout.cars), len(layout.pads))
+        self.write_chunk(LAYOUT_CHUNK, 0, len(layout.cars), len(layout.pads), 0,
+            json.dumps(layout.to_dict()).encode())
+
+    def record(self, arena):
+        self.snapshot.update(arena)
+
+        # cars were added/removed, store the new layout before the state
+        layout = self.layout
+        if layout is None or self.snapshot.car_ids != layout.car_ids or len(self.snapshot.pads) != len(layout.pads):
+            self.set_layout(ArenaLayout.from_arena(arena))
+
+        self.write_snapshot(self.snapshot)
+
+    def write_snapshot(self, snapshot):
+        i = self.buffer_len
+        self.ticks[i] = snapshot.tick_count
+        self.balls[i] = snapshot.ball
+        self.cars[i] = snapshot.cars
+        self.pads[i] = snapshot.pads
+        self.buffer_len += 1
+        self.num_records += 1
+
+        if self.buffer_len == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        n = self.buffer_len
+        if n == 0:
+            return
+
+        arrays = (self.ticks[:n], self.balls[:n], self.cars[:n], self.pads[:n])
+        payload = self.compress(pack_columns(arrays), self.compression_level)
+        self.write_chunk(STATE_CHUNK, n, self.cars.shape[1], self.pads.shape[1],
+            int(self.ticks["tick_count"][0]), payload)
+        self.buffer_len = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+
+        self.flush()
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(FOOTER.pack(index_offset, len(self.index), FOOTER_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class RecordingReader:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_size = FILE_HEADER.unpack_from(self.mm, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{path} is not a recording")
+
+        header_offset = FILE_HEADER.size
+        self.header = json.loads(self.mm[header_offset:header_offset + header_size])
+        if self.header["version"] > FORMAT_VERSION:
+            raise ValueError(f"{path} was recorded with a newer format version {self.header['version']}")
+
+        self.decompress = codecs[self.header["codec"]][1]
+        self.ball_dtype = dtype_from_descr(self.header["ball_dtype"])
+        self.car_dtype = dtype_from_descr(self.header["car_dtype"])
+        self.pad_dtype = dtype_from_descr(self.header["pad_dtype"])
+
+        index = self.read_index()
+        if index is None:
+            # the recorder was not closed properly, fall back to walking the chunks
+            index = self.scan_chunks(header_offset + header_size)
+
+        self.layouts = []
+        self.chunks = []  # (num records, num cars, num pads, first tick, offset, layout index)
+        for kind, num_records, num_cars, num_pads, first_tick, offset in index:
+            if kind == LAYOUT_CHUNK:
+                self.layouts.append(self.read_layout(offset))
+            elif kind == STATE_CHUNK and self.layouts:
+                self.chunks.append((num_records, num_cars, num_pads, first_tick, offset, len(self.layouts) - 1))
+
+        num_records = np.array([chunk[0] for chunk in self.chunks], dtype=np.int64)
+        self.chunk_starts = np.concatenate(([0], np.cumsum(num_records)))
+        self.num_records = int(self.chunk_starts[-1])
+        self.first_ticks = np.array([chunk[3] for chunk in self.chunks], dtype=np.int64)
+
+        # chunks only have fewer records than chunk_size when the layout changed or at the end
+        self.uniform_chunks = bool(np.all(num_records[:-1] == self.header["chunk_size"]))
+
+        self.cached_chunk_index = None
+        self.cached_chunk = None
+
+    def read_index(self):
+        if len(self.mm) < FOOTER.size:
+            return None
+        index_offset, num_entries, magic = FOOTER.unpack_from(self.mm, len(self.mm) - FOOTER.size)
+        if magic != FOOTER_MAGIC:
+            return None
+        return [INDEX_ENTRY.unpack_from(self.mm, index_offset + i * INDEX_ENTRY.size)
+            for i in range(num_entries)]
+
+    def scan_chunks(self, offset):
+        index = []
+        while offset + CHUNK_HEADER.size <= len(self.mm):
+            kind, num_records, num_cars, num_pads, first_tick, payload_size = CHUNK_HEADER.unpack_from(self.mm, offset)
+            if kind not in (LAYOUT_CHUNK, STATE_CHUNK) or offset + CHUNK_HEADER.size + payload_size > len(self.mm):
+                break
+            index.append((kind, num_records, num_cars, num_pads, first_tick, offset))
+            offset += CHUNK_HEADER.size + payload_size
+        return index
+
+    def read_payload(self, offset):
+        payload_size = CHUNK_HEADER.unpack_from(self.mm, offset)[-1]
+        payload_offset = offset + CHUNK_HEADER.size
+        return self.mm[payload_offset:payload_offset + payload_size]
+
+    def read_layout(self, offset):
+        return ArenaLayout.from_dict(json.loads(self.read_payload(offset)))
+
+    def find_chunk(self, record_index):
+        if self.uniform_chunks:
+            return min(record_index // self.header["chunk_size"], len(self.chunks) - 1)
+        return int(np.searchsorted(self.chunk_starts, record_index, side="right")) - 1
+
+    def find_record(self, tick_count):
+        # index of the last record at or before tick_count
+        chunk_index = max(int(np.searchsorted(self.first_ticks, tick_count, side="right")) - 1, 0)
+        ticks = self.load_chunk(chunk_index)[0]["tick_count"]
+        record_index = max(int(np.searchsorted(ticks, tick_count, side="right")) - 1, 0)
+        return int(self.chunk_starts[chunk_index]) + record_index
+
+    def load_chunk(self, chunk_index):
+        if chunk_index == self.cached_chunk_index:
+            return self.cached_chunk
+
+        num_records, num_cars, num_pads, first_tick, offset, layout_index = self.chunks[chunk_index]
+        arrays = (
+            np.zeros(num_records, dtype=[("tick_count", np.uint64)]),
+            np.zeros(num_records, dtype=self.ball_dtype),
+            np.zeros((num_records, num_cars), dtype=self.car_dtype),
+            np.zeros((num_records, num_pads), dtype=self.pad_dtype),
+        )
+        unpack_columns(self.decompress(self.read_payload(offset)), arrays)
+
+        self.cached_chunk_index = chunk_index
+        self.cached_chunk = arrays
+        return arrays
+
+    def get_layout(self, record_index):
+        return self.layouts[self.chunks[self.find_chunk(record_index)][5]]
+
+    def read_record(self, record_index, snapshot):
+        chunk_index = self.find_chunk(record_index)
+        ticks, balls, cars, pads = self.load_chunk(chunk_index)
+        i = record_index - int(self.chunk_starts[chunk_index])
+
+        snapshot.resize(cars.shape[1], pads.shape[1])
+        snapshot.tick_count = int(ticks["tick_count"][i])
+        snapshot.time = time.perf_counter()
+        copy_fields(snapshot.ball, balls[i])
+        copy_fields(snapshot.cars, cars[i])
+        copy_fields(snapshot.pads, pads[i])
+        snapshot.update_car_index()
+        snapshot.ball_state = None
+        snapshot.car_states = []
+
+    def close(self):
+        self.cached_chunk = None
+        self.mm.close()
+        self.file.close()
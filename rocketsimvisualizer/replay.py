@@ -0,0 +1,81 @@
+from rocketsimvisualizer.recording import RecordingReader
+
+import time
+
+
+# Visualizer data source that plays back a file written by Recorder
+class ReplayPlayer:
+    def __init__(self, path, speed=1.0, loop=False):
+        self.reader = RecordingReader(path)
+        if self.reader.num_records == 0:
+            raise ValueError(f"{path} has no recorded states")
+
+        self.speed = speed  # negative values play in reverse
+        self.loop = loop
+        self.paused = False
+        self.position = 0.0  # record index, fractional while playing
+        self.last_time = None
+        self.layout = self.reader.get_layout(0)
+
+        # average number of ticks between two records, used to play at the recorded tick rate
+        first_tick = int(self.reader.first_ticks[0])
+        last_tick = int(self.reader.load_chunk(len(self.reader.chunks) - 1)[0]["tick_count"][-1])
+        self.ticks_per_record = max((last_tick - first_tick) / max(self.reader.num_records - 1, 1), 1)
+
+    @property
+    def num_records(self):
+        return self.reader.num_records
+
+    @property
+    def record_index(self):
+        return int(self.position)
+
+    def play(self):
+        self.paused = False
+
+    def pause(self):
+        self.paused = True
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def set_speed(self, speed):
+        self.speed = speed
+
+    def seek(self, record_index):
+        self.position = float(min(max(record_index, 0), self.num_records - 1))
+
+    def seek_tick(self, tick_count):
+        self.seek(self.reader.find_record(tick_count))
+
+    def step(self, num_records=1):
+        self.pause()
+        self.seek(self.record_index + num_records)
+
+    def advance(self):
+        now = time.perf_counter()
+        dt = 0 if self.last_time is None else now - self.last_time
+        self.last_time = now
+
+        if self.paused:
+            return
+
+        self.position += dt * self.layout.tick_rate * self.speed / self.ticks_per_record
+
+        if 0 <= self.position < self.num_records:
+            return
+
+        if self.loop:
+            self.position %= self.num_records
+        else:
+            self.seek(self.position)
+            self.pause()
+
+    def update_snapshot(self, snapshot):
+        self.advance()
+        record_index = self.record_index
+        self.reader.read_record(record_index, snapshot)
+        self.layout = self.reader.get_layout(record_index)
+
+    def close(self):
+        self.reader.close()
@@ -27,3 +27,59 @@ void main() {
 }
     """)
 ])
+
+# per-instance model matrix (locations 2-5) and color, multiplied with per-vertex colors
+instancedShader = ShaderProgram('instancedShader', [
+    VertexShader("""
+#version 330
+layout(location = 0) in vec3 a_position;
+layout(location = 1) in vec4 a_color;
+layout(location = 2) in mat4 a_model;
+layout(location = 6) in vec4 a_instance_color;
+uniform mat4 u_mvp;
+out vec4 v_color;
+
+void main() {
+    v_color = a_color * a_instance_color;
+    gl_Position = u_mvp * a_model * vec4(a_position, 1.0);
+}
+    """),
+    FragmentShader("""
+#version 330
+in vec4 v_color;
+out vec4 outColor;
+
+void main() {
+    outColor = v_color;
+}
+    """)
+])
+
+# line strips stored in a ring buffer of `u_length` slots, older slots fade out
+trailShader = ShaderProgram('trailShader', [
+    VertexShader("""
+#version 330
+layout(location = 0) in vec3 a_position;
+uniform mat4 u_mvp;
+uniform vec4 u_color;
+uniform int u_head;
+uniform int u_length;
+out vec4 v_color;
+
+void main() {
+    int slot = gl_VertexID % u_length;  // the last slot mirrors the first one
+    int age = (u_head - slot + u_length) % u_length;
+    v_color = vec4(u_color.rgb, u_color.a * (1.0 - float(age) / float(u_length)));
+    gl_Position = u_mvp * vec4(a_position, 1.0);
+}
+    """),
+    FragmentShader("""
+#version 330
+in vec4 v_color;
+out vec4 outColor;
+
+void main() {
+    outColor = v_color;
+}
+    """)
+])
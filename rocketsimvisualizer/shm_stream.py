@@ -0,0 +1,236 @@
+from rocketsimvisualizer.snapshot import ArenaSnapshot, ArenaLayout, ball_dtype, car_dtype, pad_dtype
+
+import numpy as np
+
+from multiprocessing import shared_memory, resource_tracker
+import multiprocessing
+import json
+import time
+
+SHM_MAGIC = b"RSVSHM01"
+LAYOUT_SIZE = 1 << 16  # bytes reserved for the json arena layout
+HEADER_SIZE = 64
+VIEWER_TIMEOUT = 1.0  # seconds without a viewer heartbeat before the publisher stops writing
+
+header_dtype = np.dtype([
+    ("magic", "S8"),
+    ("max_cars", np.uint32),
+    ("max_pads", np.uint32),
+    ("num_slots", np.uint32),
+    ("layout_version", np.uint32),  # odd while the layout is being written
+    ("layout_size", np.uint32),
+    ("write_count", np.uint64),  # number of published snapshots
+    ("viewer_time", np.float64),  # time.time() of the last viewer read
+])
+
+
+def get_slot_dtype(max_cars, max_pads):
+    return np.dtype([
+        ("seq", np.uint64),  # odd while the slot is being written
+        ("layout_version", np.uint32),  # layout the cars and pads belong to
+        ("tick_count", np.uint64),
+        ("num_cars", np.uint32),
+        ("num_pads", np.uint32),
+        ("ball", ball_dtype),
+        ("cars", car_dtype, max_cars),
+        ("pads", pad_dtype, max_pads),
+    ])
+
+
+def get_views(buf, max_cars, max_pads, num_slots):
+    # numpy views into the shared memory: header, layout bytes and the snapshot ring
+    header = np.ndarray((), dtype=header_dtype, buffer=buf)
+    layout = np.ndarray(LAYOUT_SIZE, dtype=np.uint8, buffer=buf, offset=HEADER_SIZE)
+    slots = np.ndarray(num_slots, dtype=get_slot_dtype(max_cars, max_pads), buffer=buf,
+        offset=HEADER_SIZE + LAYOUT_SIZE)
+    return header, layout, slots
+
+
+def remove_stale_segment(name):
+    # a publisher that crashed or was killed never unlinks its memory, replace it if it's one of ours
+    shm = shared_memory.SharedMemory(name=name)
+    magic = bytes(shm.buf[:len(SHM_MAGIC)]) if shm.size >= HEADER_SIZE else b""
+    if magic != SHM_MAGIC:
+        shm.close()
+        raise FileExistsError(f"Shared memory {name} already exists and was not created by a SharedMemoryPublisher")
+    shm.close()
+    shm.unlink()
+
+
+# Writes arena snapshots into a shared memory ring buffer for a visualizer running in another
+# process, publish() returns right away without reading the arena when no viewer is attached
+class SharedMemoryPublisher:
+    def __init__(self, name="rocketsimvisualizer", max_cars=8, max_pads=64, num_slots=4):
+        self.name = name
+        self.max_cars = max_cars
+        self.max_pads = max_pads
+
+        size = HEADER_SIZE + LAYOUT_SIZE + num_slots * get_slot_dtype(max_cars, max_pads).itemsize
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # viewers still attached to the old memory have to be restarted
+            remove_stale_segment(name)
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.header, self.layout_buf, self.slots = get_views(self.shm.buf, max_cars, max_pads, num_slots)
+
+        self.header["max_cars"] = max_cars
+        self.header["max_pads"] = max_pads
+        self.header["num_slots"] = num_slots
+        self.header["magic"] = SHM_MAGIC
+
+        self.snapshot = ArenaSnapshot()
+        self.layout_car_ids = None
+        self.layout_num_pads = None
+
+    @property
+    def viewer_attached(self):
+        return time.time() - float(self.header["viewer_time"]) < VIEWER_TIMEOUT
+
+    def write_layout(self, layout):
+        layout.cars = layout.cars[:self.max_cars]
+        layout.pads = layout.pads[:self.max_pads]
+        data = np.frombuffer(json.dumps(layout.to_dict()).encode(), dtype=np.uint8)
+        if len(data) > LAYOUT_SIZE:
+            raise ValueError(f"Arena layout is too large for shared memory ({len(data)} bytes)")
+
+        self.header["layout_version"] += 1
+        self.layout_buf[:len(data)] = data
+        self.header["layout_size"] = len(data)
+        self.header["layout_version"] += 1
+
+        self.layout_car_ids = layout.car_ids
+        self.layout_num_pads = len(layout.pads)
+
+    def publish(self, arena):
+        if not self.viewer_attached:
+            return False
+
+        snapshot = self.snapshot
+        snapshot.update(arena)
+        num_cars = min(len(snapshot.cars), self.max_cars)
+        num_pads = min(len(snapshot.pads), self.max_pads)
+
+        if snapshot.car_ids[:num_cars] != self.layout_car_ids or num_pads != self.layout_num_pads:
+            self.write_layout(ArenaLayout.from_arena(arena))
+
+        write_count = int(self.header["write_count"])
+        slot = self.slots[write_count % len(self.slots)]
+        slot["seq"] += 1
+        slot["layout_version"] = self.header["layout_version"]
+        slot["tick_count"] = snapshot.tick_count
+        slot["num_cars"] = num_cars
+        slot["num_pads"] = num_pads
+        slot["ball"] = snapshot.ball
+        slot["cars"][:num_cars] = snapshot.cars[:num_cars]
+        slot["pads"][:num_pads] = snapshot.pads[:num_pads]
+        slot["seq"] += 1
+        self.header["write_count"] = write_count + 1
+        return True
+
+    def close(self):
+        del self.header, self.layout_buf, self.slots
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Visualizer data source reading from a SharedMemoryPublisher in another process
+class SharedMemorySource:
+    def __init__(self, name="rocketsimvisualizer", timeout: float = None):
+        self.shm = shared_memory.SharedMemory(name=name)
+        # only the publisher owns the memory, don't let the resource tracker unlink it when we exit
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        header = np.ndarray((), dtype=header_dtype, buffer=self.shm.buf)
+        if bytes(header["magic"]) != SHM_MAGIC:
+            raise ValueError(f"Shared memory {name} was not created by a SharedMemoryPublisher")
+        self.header, self.layout_buf, self.slots = get_views(self.shm.buf,
+            int(header["max_cars"]), int(header["max_pads"]), int(header["num_slots"]))
+
+        self.layout = None
+        self.layout_version = 0
+        self.read_count = 0
+        self.read_snapshot = ArenaSnapshot()  # slots are copied here first, torn reads never reach the caller
+
+        # the publisher only starts writing once it sees us
+        t0 = time.time()
+        while not self.update_layout():
+            if timeout is not None and time.time() - t0 > timeout:
+                raise TimeoutError(f"No arena was published to {name}")
+            time.sleep(0.01)
+
+    def heartbeat(self):
+        self.header["viewer_time"] = time.time()
+
+    def update_layout(self):
+        self.heartbeat()
+        layout_version = int(self.header["layout_version"])
+        if layout_version == self.layout_version or layout_version % 2:
+            return self.layout is not None
+
+        data = bytes(self.layout_buf[:int(self.header["layout_size"])])
+        if int(self.header["layout_version"]) != layout_version:
+            return self.layout is not None  # changed while reading, try again next time
+
+        self.layout = ArenaLayout.from_dict(json.loads(data))
+        self.layout_version = layout_version
+        return True
+
+    def update_snapshot(self, snapshot):
+        self.heartbeat()
+
+        write_count = int(self.header["write_count"])
+        if write_count == 0:
+            return
+
+        # seqlock read of the newest slot, fall back to older slots if it's being written,
+        # the previous snapshot is kept if none of them could be read consistently
+        read = self.read_snapshot
+        for i in range(1, len(self.slots) + 1):
+            slot = self.slots[(write_count - i) % len(self.slots)]
+            seq = int(slot["seq"])
+            if seq == 0 or seq % 2:
+                continue
+
+            # a layout that doesn't match the slot would leave the car arrays and the layout out of sync
+            layout_version = int(slot["layout_version"])
+            if layout_version != self.layout_version:
+                self.update_layout()
+                if layout_version != self.layout_version:
+                    continue
+
+            num_cars = int(slot["num_cars"])
+            num_pads = int(slot["num_pads"])
+            read.resize(num_cars, num_pads)
+            read.tick_count = int(slot["tick_count"])
+            read.ball[...] = slot["ball"]
+            read.cars[:] = slot["cars"][:num_cars]
+            read.pads[:] = slot["pads"][:num_pads]
+
+            if int(slot["seq"]) != seq:
+                continue  # written while copying
+
+            read.time = time.perf_counter()
+            read.update_car_index()
+            snapshot.copy_from(read)
+            self.read_count = write_count
+            return
+
+    def close(self):
+        del self.header, self.layout_buf, self.slots
+        self.shm.close()
+
+
+def run_viewer(name="rocketsimvisualizer", **kwargs):
+    from rocketsimvisualizer.visualizer import Visualizer
+
+    source = SharedMemorySource(name)
+    Visualizer(source=source, **kwargs).start()
+    source.close()
+
+
+def start_viewer_process(name="rocketsimvisualizer", **kwargs):
+    # kwargs are passed to Visualizer
+    process = multiprocessing.get_context("spawn").Process(target=run_viewer, args=(name,), kwargs=kwargs, daemon=True)
+    process.start()
+    return process
@@ -0,0 +1,160 @@
+from rocketsimvisualizer.snapshot import ArenaSnapshot, ArenaLayout
+from rocketsimvisualizer.profiler import FrameProfiler
+
+from collections import deque
+import threading
+import time
+
+MAX_SIM_LAG = 0.1  # seconds, if the sim falls further behind than this it stops trying to catch up
+PAUSED_SLEEP = 0.005  # seconds between checks for single steps while paused
+
+
+# Triple buffer for handing snapshots from one producer thread to one consumer thread.
+# No locks are needed since it only relies on reference assignments being atomic:
+# the consumer marks the slot it's reading and re-checks that it's still the latest,
+# the producer never writes to the latest or the currently read slot.
+class SnapshotBuffer:
+    def __init__(self):
+        self.slots = [ArenaSnapshot() for _ in range(3)]
+        self.latest = None
+        self.reading = None
+
+    def get_write_slot(self):
+        for slot in self.slots:
+            if slot is not self.latest and slot is not self.reading:
+                return slot
+
+    def publish(self, slot):
+        self.latest = slot
+
+    def acquire(self):
+        while True:
+            slot = self.latest
+            self.reading = slot
+            if self.latest is slot:
+                return slot
+
+    def release(self):
+        self.reading = None
+
+
+# Steps the arena and any tile arenas of a multi-arena view, one thread for all of them so they
+# don't each compete with the render loop for the GIL. Every arena has its own snapshot buffer.
+class SimThread(threading.Thread):
+    def __init__(self, arena, speed=1.0, ticks_per_step=1, profiler: FrameProfiler = None, tile_arenas=()):
+        super().__init__(daemon=True)
+        self.arena = arena
+        self.arenas = [arena, *tile_arenas]  # index 0 is the controlled arena
+        self.profiler = profiler if profiler is not None else FrameProfiler(enabled=False)
+        self.speed = speed  # multiple of real time, None to step as fast as possible
+        self.ticks_per_step = ticks_per_step
+        self.running = False
+        self.paused = False
+        self.step_requests = deque()  # tick counts of single steps requested while paused, appended by other threads
+        self.jump_time = 0  # time of the last state that shouldn't be blended into, e.g. the first one after a pause
+
+        # the arenas must only be read from this thread once it runs, so the layouts are captured here
+        # and published with every snapshot instead of being read by the renderer
+        self.layouts = [ArenaLayout.from_arena(arena) for arena in self.arenas]
+        self.buffers = [SnapshotBuffer() for _ in self.arenas]
+        self.pending_controls = {}  # car id -> controls, applied before the next step
+        self.controls_recorder = None  # ControlsRecorder, set by the visualizer
+
+        # only used by the consumer, previous and current published state of every arena
+        self.prev_snapshots = [ArenaSnapshot() for _ in self.arenas]
+        self.cur_snapshots = [ArenaSnapshot() for _ in self.arenas]
+
+    def set_controls(self, car_id, controls):
+        self.pending_controls[car_id] = controls
+
+    def apply_controls(self):
+        while self.pending_controls:
+            car_id, controls = self.pending_controls.popitem()
+            car = self.arena.get_car_from_id(car_id, None)
+            if car:
+                car.set_controls(controls)
+                if self.controls_recorder is not None:
+                    self.controls_recorder.record(self.arena.tick_count, car_id, controls)
+
+    def set_speed(self, speed, ticks_per_step):
+        self.speed = speed
+        self.ticks_per_step = ticks_per_step
+
+    def request_step(self, num_ticks):
+        self.step_requests.append(num_ticks)
+
+    def step(self, num_ticks=None, interpolate=True):
+        if num_ticks is None:
+            num_ticks = self.ticks_per_step
+        self.apply_controls()
+        with self.profiler.measure("sim_step"):
+            for arena in self.arenas:
+                arena.step(num_ticks)
+
+        with self.profiler.measure("sim_snapshot"):
+            slots = []
+            for i, (arena, buffer) in enumerate(zip(self.arenas, self.buffers)):
+                slot = buffer.get_write_slot()
+                read_pads = i == 0  # tiles don't draw pads
+                slot.update(arena, read_pads)
+                layout = self.layouts[i]
+                if slot.car_ids != layout.car_ids or read_pads and len(slot.pads) != len(layout.pads):
+                    layout = self.layouts[i] = ArenaLayout.from_arena(arena)
+                slot.layout = layout
+                slots.append(slot)
+
+            if not interpolate:
+                self.jump_time = max(slot.time for slot in slots)
+            for buffer, slot in zip(self.buffers, slots):
+                buffer.publish(slot)
+
+    def run(self):
+        self.running = True
+        next_step_time = time.perf_counter()
+        was_paused = False
+
+        while self.running:
+            if self.paused:
+                # the time since the last state is the pause, not a step, so these states are shown as is
+                if self.step_requests:
+                    self.step(self.step_requests.popleft(), interpolate=False)
+                else:
+                    time.sleep(PAUSED_SLEEP)
+                was_paused = True
+                next_step_time = time.perf_counter()
+                continue
+
+            self.step(interpolate=not was_paused)
+            was_paused = False
+
+            if self.speed is None:
+                continue
+
+            next_step_time += self.ticks_per_step / (self.arena.tick_rate * self.speed)
+            sleep_time = next_step_time - time.perf_counter()
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+            else:
+                next_step_time = max(next_step_time, time.perf_counter() - MAX_SIM_LAG)
+
+    def stop(self):
+        self.running = False
+
+    def read_snapshot(self, snapshot, interpolate=True, index=0):
+        # copy the latest published state of arena `index` into snapshot, optionally interpolated between
+        # the last two published states so rendering lags one step behind but moves smoothly
+        buffer = self.buffers[index]
+        slot = buffer.acquire()
+        if slot is not None and slot.time != self.cur_snapshots[index].time:
+            self.prev_snapshots[index], self.cur_snapshots[index] = self.cur_snapshots[index], self.prev_snapshots[index]
+            self.cur_snapshots[index].copy_from(slot)
+        buffer.release()
+
+        prev, cur = self.prev_snapshots[index], self.cur_snapshots[index]
+        step_dt = cur.time - prev.time
+        if not interpolate or prev.time == 0 or step_dt <= 0 or cur.time <= self.jump_time:
+            snapshot.copy_from(cur)
+            return
+
+        alpha = min(max((time.perf_counter() - cur.time) / step_dt, 0), 1)
+        snapshot.lerp(prev, cur, alpha)
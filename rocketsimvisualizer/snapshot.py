@@ -0,0 +1,232 @@
+from rocketsimvisualizer.constants import PAD_COOLDOWN_BIG, PAD_COOLDOWN_SMALL
+
+import numpy as np
+import time
+
+# CarControls fields in the order they are stored in car_dtype["controls"]
+control_names = ("throttle", "steer", "pitch", "yaw", "roll", "boost", "jump", "handbrake")
+
+ball_dtype = np.dtype([
+    ("pos", np.float32, 3),
+    ("rot", np.float32, (3, 3)),  # columns are forward, right, up
+    ("vel", np.float32, 3),
+    ("ang_vel", np.float32, 3),
+])
+
+car_dtype = np.dtype([
+    ("id", np.uint32),
+    ("team", np.uint8),
+    ("pos", np.float32, 3),
+    ("rot", np.float32, (3, 3)),
+    ("vel", np.float32, 3),
+    ("ang_vel", np.float32, 3),
+    ("boost", np.float32),
+    ("is_on_ground", np.bool_),
+    ("is_supersonic", np.bool_),
+    ("is_demoed", np.bool_),
+    ("controls", np.float32, len(control_names)),
+])
+
+pad_dtype = np.dtype([
+    ("is_active", np.bool_),
+    ("cooldown", np.float32),
+])
+
+
+def rot_mat_to_numpy(rot_mat):
+    return np.column_stack((rot_mat.forward.as_numpy(), rot_mat.right.as_numpy(), rot_mat.up.as_numpy()))
+
+
+def rot_to_quat(rot):
+    # (..., 3, 3) rotation matrices to (..., 4) w, x, y, z quaternions
+    m00, m11, m22 = rot[..., 0, 0], rot[..., 1, 1], rot[..., 2, 2]
+    quat = np.stack((
+        1 + m00 + m11 + m22,
+        1 + m00 - m11 - m22,
+        1 - m00 + m11 - m22,
+        1 - m00 - m11 + m22,
+    ), axis=-1)
+    quat = np.sqrt(np.maximum(quat, 0)) / 2
+    quat[..., 1] = np.copysign(quat[..., 1], rot[..., 2, 1] - rot[..., 1, 2])
+    quat[..., 2] = np.copysign(quat[..., 2], rot[..., 0, 2] - rot[..., 2, 0])
+    quat[..., 3] = np.copysign(quat[..., 3], rot[..., 1, 0] - rot[..., 0, 1])
+    return quat
+
+
+def quat_to_rot(quat):
+    w, x, y, z = np.moveaxis(quat, -1, 0)
+    return np.stack((
+        np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)), axis=-1),
+        np.stack((2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)), axis=-1),
+        np.stack((2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)), axis=-1),
+    ), axis=-2)
+
+
+def lerp_rot(prev, cur, alpha):
+    # normalized quaternion lerp along the shorter arc, blending the matrices directly would shear
+    # and shrink the models and collapse them near half turns
+    q0, q1 = rot_to_quat(prev), rot_to_quat(cur)
+    q0 = np.where((q0 * q1).sum(axis=-1, keepdims=True) < 0, -q0, q0)
+    quat = q0 + (q1 - q0) * alpha
+    quat /= np.linalg.norm(quat, axis=-1, keepdims=True)
+    return quat_to_rot(quat)
+
+
+# Per-frame copy of the arena state, every object is queried exactly once per update and
+# written into preallocated structured arrays that the rest of the visualizer reads from
+class ArenaSnapshot:
+    def __init__(self, num_cars=0, num_pads=0):
+        self.tick_count = 0
+        self.time = 0  # perf_counter() at the time of the update
+        self.ball = np.zeros((), dtype=ball_dtype)
+        self.cars = np.zeros(num_cars, dtype=car_dtype)
+        self.pads = np.zeros(num_pads, dtype=pad_dtype)
+        self.car_ids = []
+        self.car_index = {}  # car id -> index in self.cars
+        self.layout = None  # ArenaLayout the cars and pads belong to, set by sources that track it
+
+        # raw state objects of the last update, only used for debug text
+        self.ball_state = None
+        self.car_states = []
+
+    def resize(self, num_cars, num_pads):
+        if len(self.cars) != num_cars:
+            self.cars = np.zeros(num_cars, dtype=car_dtype)
+        if len(self.pads) != num_pads:
+            self.pads = np.zeros(num_pads, dtype=pad_dtype)
+
+    def get_car(self, car_id):
+        index = self.car_index.get(car_id, None)
+        if index is None:
+            return None
+        return self.cars[index]
+
+    def update_car_index(self):
+        car_ids = self.cars["id"].tolist()
+        if car_ids != self.car_ids:
+            self.car_ids = car_ids
+            self.car_index = {car_id: i for i, car_id in enumerate(car_ids)}
+
+    def copy_from(self, other):
+        self.resize(len(other.cars), len(other.pads))
+        self.tick_count = other.tick_count
+        self.time = other.time
+        self.ball[...] = other.ball
+        self.cars[:] = other.cars
+        self.pads[:] = other.pads
+        self.car_ids = other.car_ids
+        self.car_index = other.car_index
+        self.layout = other.layout
+        self.ball_state = other.ball_state
+        self.car_states = other.car_states
+
+    def lerp(self, prev, cur, alpha):
+        # blend continuous values between two snapshots, discrete values (tick_count included) come from cur
+        self.copy_from(cur)
+
+        for field in ("pos", "vel", "ang_vel"):
+            self.ball[field] = prev.ball[field] + (cur.ball[field] - prev.ball[field]) * alpha
+        self.ball["rot"] = lerp_rot(prev.ball["rot"], cur.ball["rot"], alpha)
+
+        if prev.car_ids == cur.car_ids:
+            for field in ("pos", "vel", "ang_vel"):
+                self.cars[field] = prev.cars[field] + (cur.cars[field] - prev.cars[field]) * alpha
+            self.cars["rot"] = lerp_rot(prev.cars["rot"], cur.cars["rot"], alpha)
+
+    def update(self, arena, read_pads=True):
+        cars = arena.get_cars()
+        pads = arena.get_boost_pads() if read_pads else []
+        self.resize(len(cars), len(pads))
+
+        self.tick_count = arena.tick_count
+        self.time = time.perf_counter()
+
+        ball_state = arena.ball.get_state()
+        self.ball["pos"] = ball_state.pos.as_numpy()
+        self.ball["rot"] = rot_mat_to_numpy(ball_state.rot_mat)
+        self.ball["vel"] = ball_state.vel.as_numpy()
+        self.ball["ang_vel"] = ball_state.ang_vel.as_numpy()
+        self.ball_state = ball_state
+
+        self.car_states = []
+        for i, car in enumerate(cars):
+            car_state = car.get_state()
+            controls = car_state.last_controls
+            self.cars[i] = (
+                car.id, int(car.team),
+                car_state.pos.as_numpy(),
+                rot_mat_to_numpy(car_state.rot_mat),
+                car_state.vel.as_numpy(),
+                car_state.ang_vel.as_numpy(),
+                car_state.boost,
+                car_state.is_on_ground,
+                car_state.is_supersonic,
+                car_state.is_demoed,
+                [getattr(controls, name) for name in control_names],
+            )
+            self.car_states.append(car_state)
+
+        self.update_car_index()
+
+        if pads:
+            pad_states = [pad.get_state() for pad in pads]
+            self.pads["is_active"] = [pad_state.is_active for pad_state in pad_states]
+            self.pads["cooldown"] = [pad_state.cooldown for pad_state in pad_states]
+
+
+# Static arena info needed to draw the arena without having the arena object, e.g. for replays
+class ArenaLayout:
+    def __init__(self, game_mode, tick_rate, ball_radius, cars=(), pads=(),
+                 pad_cooldown_big=PAD_COOLDOWN_BIG, pad_cooldown_small=PAD_COOLDOWN_SMALL):
+        self.game_mode = game_mode  # int value of rs.GameMode
+        self.tick_rate = tick_rate
+        self.ball_radius = ball_radius
+        self.cars = list(cars)  # dicts with id, team, hitbox_size, hitbox_offset and wheels
+        self.pads = list(pads)  # dicts with pos and is_big
+        # seconds from the arena's mutator config, older recordings don't have them and get the defaults
+        self.pad_cooldown_big = pad_cooldown_big
+        self.pad_cooldown_small = pad_cooldown_small
+
+    @property
+    def car_ids(self):
+        return [car["id"] for car in self.cars]
+
+    @classmethod
+    def from_arena(cls, arena):
+        cars = []
+        for car in arena.get_cars():
+            car_config = car.get_config()
+            wheels = []
+            for wheel_pair in (car_config.front_wheels, car_config.back_wheels):
+                wheels.append([wheel_pair.wheel_radius,
+                    wheel_pair.connection_point_offset.as_numpy().tolist()])
+            cars.append({
+                "id": car.id,
+                "team": int(car.team),
+                "hitbox_size": car_config.hitbox_size.as_numpy().tolist(),
+                "hitbox_offset": car_config.hitbox_pos_offset.as_numpy().tolist(),
+                "wheels": wheels,
+            })
+
+        pads = []
+        for pad in arena.get_boost_pads():
+            pads.append({"pos": pad.get_pos().as_numpy().tolist(), "is_big": bool(pad.is_big)})
+
+        mutator_config = arena.get_mutator_config()
+        return cls(int(arena.game_mode), arena.tick_rate, arena.ball.get_radius(), cars, pads,
+            mutator_config.boost_pad_cooldown_big, mutator_config.boost_pad_cooldown_small)
+
+    def to_dict(self):
+        return {
+            "game_mode": self.game_mode,
+            "tick_rate": self.tick_rate,
+            "ball_radius": self.ball_radius,
+            "cars": self.cars,
+            "pads": self.pads,
+            "pad_cooldown_big": self.pad_cooldown_big,
+            "pad_cooldown_small": self.pad_cooldown_small,
+        }
+
+    @classmethod
+    def from_dict(cls, layout_dict):
+        return cls(**layout_dict)
@@ -0,0 +1,61 @@
+from rocketsimvisualizer.constants import *
+
+import pyqtgraph as pg
+
+
+# local transforms of the parts of a car, car and pad dicts come from ArenaLayout
+
+def get_hitbox_transform(car):
+    hitbox_tr = pg.Transform3D()
+    hitbox_tr.translate(*(np.array(car["hitbox_offset"]) * mirror_x))
+    hitbox_tr.scale(*car["hitbox_size"])
+    return hitbox_tr.matrix()
+
+
+def get_axis_transform(car):
+    axis_tr = pg.Transform3D()
+    axis_tr.scale(*(np.array(car["hitbox_size"]) / 2 + np.array(car["hitbox_offset"])))
+    axis_tr.rotate(90, 0, 0, 1)
+    return axis_tr.matrix()
+
+
+def get_wheel_transforms(car):
+    wheel_transforms = []
+    for wheel_radius, connection_point_offset in car["wheels"]:
+        for sign in (1, -1):
+            wheel_pos = -np.array(connection_point_offset)
+            wheel_pos[1] *= sign
+            wheel_pos[2] += wheel_radius + 4  # guesstimate of compressed suspension
+            wheel_tr = pg.Transform3D()
+            wheel_tr.translate(*wheel_pos)
+            wheel_tr.rotate(90, 1, 0, 0)
+            wheel_tr.scale(round(wheel_radius), round(wheel_radius), 1)
+            wheel_transforms.append(wheel_tr.matrix())
+    return wheel_transforms
+
+
+def get_pad_transform(pad):
+    pad_tr = pg.Transform3D()
+    pad_tr.translate(*(np.array(pad["pos"]) * mirror_x))
+    pad_tr.scale(*(pad_sq_dims_big if pad["is_big"] else pad_sq_dims_small))
+    return pad_tr.matrix()
+
+
+def set_car_models(car_models, cars):
+    # world transforms of all cars from the snapshot records
+    car_models[:, :3, :3] = cars["rot"] * mirror_x_rot
+    car_models[:, :3, 3] = cars["pos"] * mirror_x
+
+
+def get_frustum_planes(mvp):
+    # (6, 4) planes from a row-major view projection matrix, normals point inside
+    planes = np.array([mvp[3] + mvp[0], mvp[3] - mvp[0],
+                       mvp[3] + mvp[1], mvp[3] - mvp[1],
+                       mvp[3] + mvp[2], mvp[3] - mvp[2]])
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+
+def in_frustum(planes, centers, radius):
+    # which bounding spheres are at least partially inside the frustum
+    distances = centers @ planes[:, :3].T + planes[:, 3]
+    return np.all(distances > -np.reshape(radius, (-1, 1)), axis=1)
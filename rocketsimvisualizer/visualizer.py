@@ -1,7 +1,20 @@
-from rocketsimvisualizer import KeyboardController, GenericController, GL2DTextItem
-from rocketsimvisualizer.arena_mesh import get_arena_mesh
+from rocketsimvisualizer import KeyboardController, GenericController, GL2DTextItem, GLInstancedMeshItem, GLTrailItem
+from rocketsimvisualizer.GLInstancedMeshItem import mesh_to_triangles, mesh_to_lines, circle_lines
+from rocketsimvisualizer.arena_mesh import get_arena_mesh, get_arena_edges
+from rocketsimvisualizer.snapshot import ArenaSnapshot, ArenaLayout, control_names, pad_dtype
+from rocketsimvisualizer.sim_thread import SimThread
+from rocketsimvisualizer.replay import ReplayPlayer
+from rocketsimvisualizer.net_stream import StreamSource
+from rocketsimvisualizer.profiler import FrameProfiler
+from rocketsimvisualizer.multi_arena import ArenaTile, get_arena_tints, get_tile_offsets
+from rocketsimvisualizer.ball_prediction import BallPredictor
+from rocketsimvisualizer.frame_pacing import FrameScheduler, SimClock
+from rocketsimvisualizer.camera import CameraController
+from rocketsimvisualizer.controls_recording import ControlsRecorder
+from rocketsimvisualizer.generic_controller import set_controls_from_batch
 from rocketsimvisualizer.constants import *
 from rocketsimvisualizer.shader import cShader
+from rocketsimvisualizer.transforms import *
 
 from pyqtgraph.Qt import QtCore, QtGui
 from OpenGL.GL import *
@@ -17,22 +30,86 @@ import threading
 import time
 import math
 
+import functools
 import pathlib
 import tomllib
 
 current_dir = pathlib.Path(__file__).parent
 
-with open(current_dir / "rsvconfig-default.toml", "rb") as file:
-    default_config_dict = tomllib.load(file)
 
-# disable vsync
-_format = QtGui.QSurfaceFormat()
-_format.setSwapInterval(0)
-QtGui.QSurfaceFormat.setDefaultFormat(_format)
+@functools.cache
+def get_default_config():
+    with open(current_dir / "rsvconfig-default.toml", "rb") as file:
+        return tomllib.load(file)
+
+# debug text fields per type, see get_text_fields
+text_fields_cache = {}
+
+
+def format_float(value):
+    return f"{value:.2f}"
+
+
+def format_numpy(value):
+    value = value.tolist()
+    if isinstance(value, list):
+        return str(np.round(value, 2).tolist())
+    if isinstance(value, (bool, int)):
+        return str(value)
+    return format_float(value)
+
+
+def get_formatter(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return format_numpy
+    if isinstance(value, (bool, int)):
+        return str
+    try:
+        format_float(value)
+        return format_float
+    except TypeError:
+        return None  # methods and other values that can't be shown
+
+
+def get_text_fields(var):
+    # which fields of var are shown and how to format them, only computed once per type
+    if isinstance(var, dict):
+        cache_key = tuple(var)
+    elif isinstance(var, (np.ndarray, np.void)):
+        cache_key = var.dtype
+    else:
+        cache_key = type(var)
+
+    fields = text_fields_cache.get(cache_key, None)
+    if fields is None:
+        if isinstance(var, (dict, np.ndarray, np.void)):
+            keys = list(var) if isinstance(var, dict) else var.dtype.names
+            values = [var[key] for key in keys]
+        else:
+            keys = [key for key in dir(var)
+                if not key.startswith("_") and "last_rel_dodge_torque" not in key]  # skip deprecated alias
+            values = [getattr(var, key) for key in keys]
+
+        fields = [(key, formatter) for key, value in zip(keys, values)
+            if (formatter := get_formatter(value)) is not None]
+        text_fields_cache[cache_key] = fields
+
+    return fields
+
+
+def get_field_colors(field_v):
+    # same coloring as cShader but per vertex, for when the field is drawn without it
+    norm_pos = field_v[:, 1:2] / 5120.0
+    blue = np.array([0.25, 0.5, 1.0])
+    orange = np.array([1.0, 0.25, 0.15])
+    side_color = np.maximum(norm_pos, 0) * orange - np.minimum(norm_pos, 0) * blue
+    color = side_color + (1 - np.abs(norm_pos)) * 0.2
+    return np.concatenate([color, np.full((len(field_v), 1), 0.3)], axis=1)
+
 
 class Visualizer:
     def __init__(
-        self, arena,
+        self, arena=None,
         meshes_path="collision_meshes",
         fps=60,
         step_arena=False,
@@ -41,67 +118,150 @@ class Visualizer:
         overwrite_controls=False,
         config_dict: dict = None,
         controller_class: GenericController = None,
+        threaded_sim=False,
+        sim_speed=1.0,
+        interpolate=True,
+        source=None,
+        enable_profiler=False,
+        multi_arena_mode="overlay",
+        tile_columns: int = None,
+        vsync=False,
+        idle_fps=10,
+        field_lod="full",
+        crease_angle=30,
+        record_controls: str = None,
         **kwargs):
 
+        # several arenas can be passed as a list, the first one is the one we control/spectate
+        arenas = []
+        if isinstance(arena, (list, tuple)):
+            arenas = list(arena)
+            arena = arenas[0] if arenas else None
+
+        if arena is None and source is None:
+            raise ValueError("Visualizer needs either an arena or a source")
+
+        # disable vsync, frames are paced by FrameScheduler unless vsync is True
+        surface_format = QtGui.QSurfaceFormat.defaultFormat()
+        surface_format.setSwapInterval(1 if vsync else 0)
+        QtGui.QSurfaceFormat.setDefaultFormat(surface_format)
+
         self.app = pg.mkQApp()
         self.w = gl.GLViewWidget()
         self.w.setWindowTitle("pyqtgraph visualizer")
         self.w.setGeometry(0, 50, 1280, 720)
 
         self.arena = arena
+        self.source = source  # used instead of the arena when set, e.g. a ReplayPlayer
         self.meshes_path = meshes_path
         self.fps = fps
-        self.step_arena = step_arena
+        self.vsync = vsync  # start frames when the last one was swapped instead of on a timer
+        self.idle_fps = idle_fps  # frame rate while paused, unfocused or minimized, None to disable
+        self.idle = False
+        self.scheduler = FrameScheduler(fps)
+        self.timer = None
+        self.step_arena = step_arena and self.source is None
         self.enable_debug_text = enable_debug_text
-        self.overwrite_controls = overwrite_controls
+        self.overwrite_controls = overwrite_controls and self.source is None
+        self.multi_arena_mode = multi_arena_mode  # "overlay" or "tiled"
+        if multi_arena_mode not in ("overlay", "tiled"):
+            raise ValueError(f"Unknown multi_arena_mode {multi_arena_mode!r}, expected 'overlay' or 'tiled'")
         self.config_dict = config_dict
+        self.interpolate = interpolate
+        self.profiler = FrameProfiler(enabled=enable_profiler)
 
-        self.car_id = None  # id of the car we control/spectate
-        self.target_id = 0  # item to track with target cam, 0 for ball otherwise a car id
-        self.manual_swivel = False  # used when moving the camera manually
-        self.target_cam = True  # general form of ball cam that can track other cars too
-        self.free_cam = False  # don't use player cam
+        # static arena info, cars and pads are drawn from this
+        self.sim_thread = None  # not started yet, the layout can still be read from the arena
+        self.layout = None
+        self.update_layout()
 
         if tick_skip is None:
-            self.tick_skip = round(self.arena.tick_rate / fps)
+            self.tick_skip = round(self.layout.tick_rate / fps)
         else:
             self.tick_skip = round(tick_skip)
 
+        # speed, pause and single steps of the arena when we step it, changed at runtime by the input actions
+        self.sim_clock = SimClock(self.tick_skip, speed=sim_speed)
+
+        # step the arena and the tile arenas in one background thread, decoupled from rendering
+        if self.step_arena and threaded_sim:
+            self.sim_thread = SimThread(self.arena, speed=sim_speed, ticks_per_step=self.sim_clock.get_ticks_per_step(),
+                profiler=self.profiler, tile_arenas=arenas[1:])
+
+        # other arenas only have their dynamic objects drawn, either overlaid or tiled next to each other
+        self.arena_tiles = [ArenaTile(tile_arena, tint, np.zeros(3))
+            for tile_arena, tint in zip(arenas[1:], get_arena_tints(len(arenas))[1:])]
+        if self.sim_thread is not None:
+            for i, tile in enumerate(self.arena_tiles, 1):
+                tile.sim_thread = self.sim_thread
+                tile.sim_index = i
+        # log every CarControls applied by the visualizer, see ControlsReplayController
+        self.controls_recorder = None
+        if record_controls is not None and self.arena is not None:
+            self.controls_recorder = ControlsRecorder(record_controls, tick_rate=self.layout.tick_rate)
+            if self.sim_thread is not None:
+                self.sim_thread.controls_recorder = self.controls_recorder
+
         if self.config_dict is None:
             print("Using default configs")
-            self.config_dict = default_config_dict
+            self.config_dict = get_default_config()
 
-        self.cam_dict = self.config_dict["CAMERA"]
+        default_config_dict = get_default_config()
+        self.cam_dict = {**default_config_dict["CAMERA"], **self.config_dict["CAMERA"]}
         self.input_dict = self.config_dict["INPUT"]
+        self.camera = CameraController(self.w, self.cam_dict)
+        self.text_dict = {**default_config_dict["TEXT"], **self.config_dict.get("TEXT", {})}
+        self.trails_dict = {**default_config_dict["TRAILS"], **self.config_dict.get("TRAILS", {})}
+        self.prediction_dict = {**default_config_dict["PREDICTION"], **self.config_dict.get("PREDICTION", {})}
 
         if controller_class is None:
             controller_class = KeyboardController
 
         self.controller = controller_class(self.input_dict)
+        self.last_input_time = 0.0
+        self.batch_controls = None  # see set_batch_controls
 
         GenericController.switch_car = lambda *args: self.switch_car()
         GenericController.switch_target = lambda *args: self.switch_target()
         GenericController.toggle_target_cam = lambda *args: self.toggle_target_cam()
         GenericController.toggle_free_cam = lambda *args: self.toggle_free_cam()
+        GenericController.playback_action = lambda controller, action: self.playback_action(action)
 
         self.app.focusChanged.connect(self.controller.reset_controls)
 
         self.w.mousePressEvent = self.mousePressEvent
         self.w.mouseReleaseEvent = self.mouseReleaseEvent
 
+        # time GL painting and the buffer swap that follows it
+        if self.profiler.enabled:
+            self.paint_end_time = None
+            self.paintGL = self.w.paintGL
+            self.w.paintGL = self.profiled_paintGL
+            self.w.frameSwapped.connect(self.on_frame_swapped)
+        if self.vsync:
+            self.w.frameSwapped.connect(self.on_vsync_swap)
+
         self.white_color = np.array((1, 1, 1, 1))
         self.black_color = np.array((0, 0, 0, 1))
 
         self.blue_color = np.array([0, 0.4, 0.8, 1])
         self.orange_color = np.array([1, 0.2, 0.1, 1])
 
+        self.team_colors = np.zeros((2, 4))
+        self.team_colors[int(rs.Team.BLUE)] = self.blue_color
+        self.team_colors[int(rs.Team.ORANGE)] = self.orange_color
+
         # initial camera settings
         self.w.opts["fov"] = self.cam_dict["FOV"]
         self.w.opts["distance"] = self.cam_dict["DISTANCE"]
         self.w.show()
 
+        # arena state, updated once per frame
+        self.snapshot = ArenaSnapshot()
+        self.last_tick_count = None
+
         # text info
-        self.text_item = GL2DTextItem(font_size=11)
+        self.text_item = GL2DTextItem(font_size=self.text_dict["FONT_SIZE"])
         self.text_item.setDepthValue(2)
         self.addItem(self.text_item)
 
@@ -109,18 +269,30 @@ class Visualizer:
         grid_y_subdivs = 5
         grid_z_subdivs = 2
 
-        if self.arena.game_mode != rs.GameMode.THE_VOID:
-            if self.arena.game_mode == rs.GameMode.HOOPS:
-                field_type = "hoops"
-                FIELD_EXTENT_X = HOOPS_EXTENT_X
-                FIELD_EXTENT_Y = HOOPS_EXTENT_Y
-                FIELD_EXTENT_Z = HOOPS_EXTENT_Z
-            else:
-                field_type = "soccar"
-                FIELD_EXTENT_X = SOCCAR_EXTENT_X
-                FIELD_EXTENT_Y = SOCCAR_EXTENT_Y
-                FIELD_EXTENT_Z = SOCCAR_EXTENT_Z
+        game_mode = self.layout.game_mode
 
+        if game_mode == int(rs.GameMode.HOOPS):
+            field_type = "hoops"
+            FIELD_EXTENT_X = HOOPS_EXTENT_X
+            FIELD_EXTENT_Y = HOOPS_EXTENT_Y
+            FIELD_EXTENT_Z = HOOPS_EXTENT_Z
+        else:
+            field_type = "soccar"
+            FIELD_EXTENT_X = SOCCAR_EXTENT_X
+            FIELD_EXTENT_Y = SOCCAR_EXTENT_Y
+            FIELD_EXTENT_Z = SOCCAR_EXTENT_Z
+
+        tiled = self.multi_arena_mode == "tiled" and self.arena_tiles
+        self.field_items = []
+        self.tile_field_transforms = None
+        self.tile_field_mask = None
+        tile_offsets = get_tile_offsets(len(self.arena_tiles) + 1,
+            (FIELD_EXTENT_X * 2, FIELD_EXTENT_Y * 2), tile_columns)
+        if tiled:
+            for tile, offset in zip(self.arena_tiles, tile_offsets[1:]):
+                tile.offset = offset
+
+        if game_mode != int(rs.GameMode.THE_VOID):
             # ground grid
             grid_item = gl.GLGridItem()
             grid_item.setSize(FIELD_EXTENT_X * 2, FIELD_EXTENT_Y * 2, 1)
@@ -146,7 +318,7 @@ class Visualizer:
                 grid_item.translate(sign * FIELD_EXTENT_X, 0, FIELD_EXTENT_Z / 2)
                 self.addItem(grid_item)
 
-            if self.arena.game_mode == rs.GameMode.HOOPS:
+            if game_mode == int(rs.GameMode.HOOPS):
                 for sign in (1, -1):
                     grid_item = gl.GLGridItem()
                     grid_item.setSize(FIELD_EXTENT_X * 2, FIELD_EXTENT_Z, 1)
@@ -165,18 +337,47 @@ class Visualizer:
                 'glBlendFunc': (GL_SRC_ALPHA, GL_ONE)}
             }
 
+            # "full" draws every triangle edge, "feature_edges" only edges above the crease angle,
+            # "faces" and "edges" draw only one of the two
+            draw_faces = field_lod != "edges"
+            draw_feature_edges = field_lod in ("feature_edges", "edges") or (tiled and field_lod == "full")
+
             field_v, field_f = get_arena_mesh(self.meshes_path, field_type)
-            field_mi = gl.GLMeshItem(vertexes=field_v, faces=field_f, **mi_kwargs)
-            self.addItem(field_mi)
+            if tiled:
+                # one copy of the field per tile from the same vertex buffers
+                if draw_faces:
+                    field_tri_v = field_v[field_f].reshape(-1, 3)
+                    self.field_items.append(GLInstancedMeshItem(field_tri_v, get_field_colors(field_tri_v),
+                        glOptions=mi_kwargs["glOptions"]))
+                self.tile_field_transforms = np.tile(np.eye(4), (len(tile_offsets), 1, 1))
+                self.tile_field_transforms[:, :3, 3] = tile_offsets
+                self.tile_field_centers = tile_offsets + [0, 0, FIELD_EXTENT_Z / 2]
+                self.tile_field_radius = np.linalg.norm([FIELD_EXTENT_X, FIELD_EXTENT_Y, FIELD_EXTENT_Z / 2])
+            elif draw_faces:
+                mi_kwargs["drawEdges"] = field_lod == "full"
+                self.field_items.append(gl.GLMeshItem(vertexes=field_v, faces=field_f, **mi_kwargs))
+
+            if draw_feature_edges:
+                field_edges = get_arena_edges(self.meshes_path, field_type, crease_angle)
+                edges_item = GLInstancedMeshItem(field_edges, mode=GL_LINES, glOptions=mi_kwargs["glOptions"])
+                edges_item.setInstanceData(np.eye(4)[None], [mi_kwargs["edgeColor"]])
+                self.field_items.append(edges_item)
+
+            for field_item in self.field_items:
+                if tiled:
+                    # colors are set once for every tile, the faces have vertex colors and the edges keep edgeColor
+                    color = mi_kwargs["edgeColor"] if field_item.mode == GL_LINES else (1, 1, 1, 1)
+                    field_item.setInstanceData(self.tile_field_transforms, np.tile(color, (len(tile_offsets), 1)))
+                self.addItem(field_item)
 
         # Create ball geometry
-        if self.arena.game_mode == rs.GameMode.SNOWDAY:
+        if game_mode == int(rs.GameMode.SNOWDAY):
             ball_radius = PUCK_RADIUS
             ball_md = gl.MeshData.cylinder(
                 rows=2, cols=16, radius=(PUCK_RADIUS, PUCK_RADIUS), length=PUCK_HEIGHT)
             ball_md._vertexes = np.array(ball_md._vertexes) - np.array([0, 0, PUCK_HEIGHT / 2])
         else:
-            ball_radius = self.arena.ball.get_radius()
+            ball_radius = self.layout.ball_radius
             ball_md = gl.MeshData.sphere(rows=8, cols=16, radius=ball_radius)
         self.ball_mi = gl.GLMeshItem(meshdata=ball_md, smooth=False, drawFaces=True, drawEdges=True, color=(0.1, 0.1, 0.1, 1), edgeColor=self.white_color)
         self.addItem(self.ball_mi)
@@ -187,136 +388,209 @@ class Visualizer:
             drawFaces=False, drawEdges=True, edgeColor=self.white_color)
         self.addItem(self.ball_proj)
 
-        self.pads_mi = []
+        # predicted ball positions, drawn as rings every PREDICTION_MARKER_INTERVAL seconds
+        self.ball_predictor = None
+        if self.prediction_dict["ENABLED"] and self.arena is not None and self.source is None:
+            self.ball_predictor = BallPredictor(self.arena,
+                seconds=self.prediction_dict["SECONDS"],
+                tolerance=self.prediction_dict["TOLERANCE"],
+                with_cars=self.prediction_dict["WITH_CARS"] and self.sim_thread is None)
+        self.prediction_item = GLInstancedMeshItem(circle_lines(16), mode=GL_LINES, glOptions="translucent")
+        self.prediction_marker_ticks = max(round(self.layout.tick_rate * PREDICTION_MARKER_INTERVAL), 1)
+        self.prediction_scale = ball_radius
+        self.drawn_prediction = None
+        self.prediction_models = np.zeros((0, 4, 4))
+        self.first_prediction_marker = 0
+        if self.ball_predictor is not None:
+            self.addItem(self.prediction_item)
+
+        # boost pads, drawn as one instanced item
+        self.pads_item = GLInstancedMeshItem(mesh_to_lines(box_verts, box_faces), mode=GL_LINES)
+        self.addItem(self.pads_item)
         self.init_pads()
 
-        self.car_mi_dict = {}
+        # cars, each part is drawn for every car with a single instanced item
+        car_tri_verts, car_tri_colors = mesh_to_triangles(box_verts, box_faces, box_colors)
+        self.cars_item = GLInstancedMeshItem(car_tri_verts, car_tri_colors)
+        self.car_edges_item = GLInstancedMeshItem(mesh_to_lines(box_verts, box_faces), mode=GL_LINES)
+        self.wheels_item = GLInstancedMeshItem(circle_lines(8), mode=GL_LINES)
+        self.car_axes_item = GLInstancedMeshItem(axis_verts, axis_colors, mode=GL_LINES,
+            glOptions={GL_DEPTH_TEST: False})
+        self.car_axes_item.setDepthValue(1)
+        for item in (self.cars_item, self.car_edges_item, self.wheels_item, self.car_axes_item):
+            self.addItem(item)
+
+        # position history of the ball and cars, one point every tick_skip ticks so the trails
+        # cover SECONDS of game time at any fps, sim speed or replay speed
+        self.trail_sample_ticks = max(self.tick_skip, 1)
+        trail_length = round(self.trails_dict["SECONDS"] * self.layout.tick_rate / self.trail_sample_ticks)
+        self.ball_trail_item = GLTrailItem(1, trail_length)
+        self.car_trails_item = GLTrailItem(0, trail_length)
+        self.ball_trail_pos = np.zeros((1, 3))
+        self.trail_tick_count = None
+        if self.trails_dict["BALL"]:
+            self.addItem(self.ball_trail_item)
+        if self.trails_dict["CARS"]:
+            self.addItem(self.car_trails_item)
+
+        self.car_ids = []  # in snapshot order
         self.init_cars()
 
+        # cars and balls of the other arenas, tinted per arena
+        if self.arena_tiles:
+            self.tile_cars_item = GLInstancedMeshItem(car_tri_verts, car_tri_colors)
+            self.tile_car_edges_item = GLInstancedMeshItem(mesh_to_lines(box_verts, box_faces), mode=GL_LINES)
+            self.tile_balls_item = GLInstancedMeshItem(
+                mesh_to_lines(ball_md.vertexes(), ball_md.faces()), mode=GL_LINES)
+            for item in (self.tile_cars_item, self.tile_car_edges_item, self.tile_balls_item):
+                self.addItem(item)
+
         self.fps_t0 = time.perf_counter()
-        self.tick_time = time.perf_counter()
-        self.tick_time_drift = 0
+        self.fps_frames = 0
+        self.frame_time = time.perf_counter()
+
+    def update_layout(self):
+        if self.source is not None:
+            self.layout = self.source.layout
+        elif self.sim_thread is not None:
+            # never read the arena while the sim thread might be stepping it
+            self.layout = self.snapshot.layout or self.sim_thread.layouts[0]
+        else:
+            self.layout = ArenaLayout.from_arena(self.arena)
 
     def init_cars(self):
+        cars = self.layout.cars
+
+        self.car_ids = [car["id"] for car in cars]
+        self.batch_car_controls = [rs.CarControls() for _ in cars]
+        self.car_models = np.tile(np.eye(4), (len(cars), 1, 1))
+        self.car_colors = np.zeros((len(cars), 4))
+        self.car_edge_colors = np.tile(self.white_color, (len(cars), 1))
 
-        if self.car_mi_dict:
-            self.w.items = [i for i in self.w.items if i not in self.car_mi_dict.values()]
-            self.car_mi_dict.clear()
+        hitbox_transforms = []
+        axis_transforms = []
+        wheel_transforms = []
 
         # Create car geometry
-        for car in self.arena.get_cars():
+        for i, car in enumerate(cars):
+            self.car_colors[i] = self.blue_color if car["team"] == int(rs.Team.BLUE) else self.orange_color
 
-            # car hitbox as mesh
-            car_config = car.get_config()
-            hitbox_size = car_config.hitbox_size.as_numpy()
-            hitbox_offset = car_config.hitbox_pos_offset.as_numpy()
+            hitbox_transforms.append(get_hitbox_transform(car))
+            axis_transforms.append(get_axis_transform(car))
+            wheel_transforms += get_wheel_transforms(car)
 
-            hitbox_verts = box_verts * hitbox_size + hitbox_offset * [-1, 1, 1]
+        self.car_hitbox_transforms = np.array(hitbox_transforms).reshape(-1, 4, 4)
+        self.car_axis_transforms = np.array(axis_transforms).reshape(-1, 4, 4)
+        self.car_wheel_transforms = np.array(wheel_transforms).reshape(-1, 4, 4, 4)
 
-            car_mi = gl.GLMeshItem(vertexes=hitbox_verts, faces=box_faces, smooth=False, drawFaces=True, drawEdges=True, edgeColor=self.white_color)
+        # world transforms of every part, written in place each frame
+        self.hitbox_models = np.zeros((len(cars), 4, 4))
+        self.axis_models = np.zeros((len(cars), 4, 4))
+        self.wheel_models = np.zeros((len(cars), 4, 4, 4))
+        self.car_supersonic = np.zeros(len(cars), dtype=bool)
 
-            self.addItem(car_mi)
-            self.car_mi_dict[car.id] = car_mi
+        # colors only change with the cars themselves or when going supersonic
+        self.cars_item.setInstanceColors(self.car_colors)
+        self.car_edges_item.setInstanceColors(self.car_edge_colors)
+        self.car_axes_item.setInstanceColors(np.ones((len(cars), 4)))
+        self.wheels_item.setInstanceColors(np.ones((len(cars) * 4, 4)))
+        self.car_trails_item.resize(len(cars), colors=self.car_colors)
 
-            # axis item
-            axis_item = gl.GLAxisItem()
-            axis_item.rotate(90, 0, 0, 1)
-            axis_item.scale(*(hitbox_size / 2 + hitbox_offset), local=False)
-            axis_item.setDepthValue(1)
-            axis_item.setGLOptions({GL_DEPTH_TEST: False})
-            axis_item.setParentItem(car_mi)
+        self.camera.set_cars(self.car_ids)
 
-            # wheels
-            for wheel_pair in (car_config.front_wheels, car_config.back_wheels):
-                wheel_radius = wheel_pair.wheel_radius
-                wheel_md = gl.MeshData.cylinder(rows=1, cols=8, length=0,
-                    radius=round(wheel_radius))
-                for sign in (1, -1):
-                    wheel_mi = gl.GLMeshItem(meshdata=wheel_md, drawFaces=False,
-                        drawEdges=True, smooth=False, edgeColor=self.white_color)
-                    wheel_pos = -wheel_pair.connection_point_offset.as_numpy()
-                    wheel_pos[1] *= sign
-                    wheel_pos[2] += wheel_radius + 4  # guesstimate of compressed suspension
-                    wheel_mi.translate(*wheel_pos)
-                    wheel_mi.rotate(90, 1, 0, 0, local=True)
-                    wheel_mi.setParentItem(car_mi)
+    def init_pads(self):
+        pads = self.layout.pads
 
-        if self.car_id not in self.car_mi_dict:
-            self.switch_car()
+        self.pad_transforms = np.zeros((len(pads), 4, 4))
+        self.pad_colors = np.zeros((len(pads), 4))
+        self.pad_max_cooldowns = np.zeros(len(pads))
 
-        if self.target_id != 0 and self.target_id not in self.car_mi_dict:
-            self.switch_target()
+        for i, pad in enumerate(pads):
+            self.pad_transforms[i] = get_pad_transform(pad)
+            self.pad_colors[i] = self.white_color if pad["is_big"] else self.white_color / 2
+            self.pad_max_cooldowns[i] = self.layout.pad_cooldown_big if pad["is_big"] else self.layout.pad_cooldown_small
 
-    def init_pads(self):
+        # every pad is always drawn, inactive ones are dimmed and shrunk by their cooldown progress
+        self.pad_models = self.pad_transforms.copy()
+        self.pad_state = np.zeros(len(pads), dtype=pad_dtype)  # state of the last drawn frame
+        self.pad_state["is_active"] = True
+        self.pads_item.setInstanceData(self.pad_models, self.pad_colors)
+
+    @property
+    def car_id(self):
+        return self.camera.car_id
 
-        if self.pads_mi:
-            self.w.items = [i for i in self.w.items if i not in self.pads_mi]
-            self.pads_mi.clear()
-
-        big_pad_box_md = gl.MeshData(vertexes=box_verts * pad_sq_dims_big, faces=box_faces)
-        small_pad_box_md = gl.MeshData(vertexes=box_verts * pad_sq_dims_small, faces=box_faces)
-
-        for pad in self.arena.get_boost_pads():
-            # pad hitbox
-            pad_box_md = big_pad_box_md if pad.is_big else small_pad_box_md
-            pad_box_edge_color = self.white_color if pad.is_big else self.white_color / 2
-            pad_box_mi = gl.GLMeshItem(meshdata=pad_box_md, drawFaces=False,
-                drawEdges=True, edgeColor=pad_box_edge_color)
-            pad_pos = pad.get_pos()
-            pad_box_mi.translate(-pad_pos.x, pad_pos.y, pad_pos.z)
-            self.pads_mi.append(pad_box_mi)
-            self.addItem(pad_box_mi)
-
-    def get_cam_targets(self):
-        targets = {0: self.ball_mi}
-        if not self.car_mi_dict:
-            return targets
-        targets = {**targets, **self.car_mi_dict}
-        targets.pop(self.car_id)
-        return targets
-
-    def get_cam_target(self):
-        targets = self.get_cam_targets()
-        return targets[self.target_id]
+    @car_id.setter
+    def car_id(self, car_id):
+        self.camera.car_id = car_id
+
+    @property
+    def target_id(self):
+        return self.camera.target_id
+
+    @target_id.setter
+    def target_id(self, target_id):
+        self.camera.target_id = target_id
 
     def switch_target(self):
-        targets = self.get_cam_targets()
-        sorted_target_ids = sorted(targets)
-        if self.target_id in sorted_target_ids:
-            target_index = sorted_target_ids.index(self.target_id)
-            target_index = (target_index + 1) % len(sorted_target_ids)
-            self.target_id = sorted_target_ids[target_index]
-        elif self.target_id == 0:
-            self.target_id = sorted_target_ids[0]
-        else:
-            self.target_id = 0
+        self.camera.switch_target()
 
     def switch_car(self):
         if self.overwrite_controls and self.car_id:
             # reset car controls before switching cars
-            car = self.arena.get_car_from_id(self.car_id, None)
-            if car:
-                car.set_controls(rs.CarControls())
-
-        if self.car_mi_dict:
-            sorted_car_mi_ids = sorted(self.car_mi_dict)
-            if self.car_id in sorted_car_mi_ids:
-                car_index = sorted_car_mi_ids.index(self.car_id)
-                car_index = (car_index + 1) % len(sorted_car_mi_ids)
-                self.car_id = sorted_car_mi_ids[car_index]
-            elif len(sorted_car_mi_ids) > 0:
-                self.car_id = sorted_car_mi_ids[0]
-            else:
-                self.car_id = None
-
-        if self.car_id == self.target_id:
-            self.switch_target()
+            self.set_car_controls(self.car_id, rs.CarControls())
+        self.camera.switch_car()
 
     def toggle_target_cam(self):
-        self.target_cam = not self.target_cam
+        self.camera.toggle_target_cam()
 
     def toggle_free_cam(self):
-        self.free_cam = not self.free_cam
+        self.camera.toggle_free_cam()
+
+    def playback_action(self, action):
+        if isinstance(self.source, ReplayPlayer):
+            self.replay_action(action)
+        elif self.step_arena:
+            self.sim_speed_action(action)
+
+    def replay_action(self, action):
+        player = self.source
+        if action == "PAUSE":
+            player.toggle_pause()
+        elif action == "SPEED_UP":
+            player.set_speed(math.copysign(min(abs(player.speed) * 2, MAX_PLAYBACK_SPEED), player.speed))
+        elif action == "SLOW_DOWN":
+            player.set_speed(math.copysign(max(abs(player.speed) / 2, MIN_PLAYBACK_SPEED), player.speed))
+        elif action == "REVERSE":
+            player.set_speed(-player.speed)
+        elif action == "SEEK_FORWARD":
+            player.seek(player.record_index + player.layout.tick_rate * SEEK_SECONDS / player.ticks_per_record)
+        elif action == "SEEK_BACKWARD":
+            player.seek(player.record_index - player.layout.tick_rate * SEEK_SECONDS / player.ticks_per_record)
+        elif action == "STEP":
+            player.step(1 if player.speed >= 0 else -1)
+
+    def sim_speed_action(self, action):
+        clock = self.sim_clock
+        if action == "PAUSE":
+            clock.toggle_pause()
+        elif action == "SPEED_UP":
+            clock.speed_up()
+        elif action == "SLOW_DOWN":
+            clock.slow_down()
+        elif action == "UNLIMITED":
+            clock.toggle_unlimited()
+        elif action == "STEP":
+            clock.step()
+
+        # the sim thread paces itself, it only gets the speed and publishes about one state per frame
+        sim_thread = self.sim_thread
+        if sim_thread is not None:
+            sim_thread.set_speed(clock.speed, clock.get_ticks_per_step())
+            if clock.pending_ticks:
+                sim_thread.request_step(clock.pending_ticks)
+            sim_thread.paused = clock.paused
+            clock.pending_ticks = 0
 
     def addItem(self, item):
         self.w.items.append(item)
@@ -327,207 +601,444 @@ class Visualizer:
         item._setView(self.w)
         item.update = lambda *args: None
 
+    def profiled_paintGL(self, *args, **kwargs):
+        with self.profiler.measure("paint"):
+            self.paintGL(*args, **kwargs)
+        self.paint_end_time = time.perf_counter()
+
+    def on_frame_swapped(self):
+        if self.paint_end_time is not None:
+            self.profiler.add("swap", time.perf_counter() - self.paint_end_time)
+            self.paint_end_time = None
+
+    def dump_profile(self, path):
+        # csv or json depending on the file extension
+        self.profiler.dump(path)
+
     def mousePressEvent(self, ev):
         lpos = ev.position() if hasattr(ev, 'position') else ev.localPos()
         self.w.mousePos = lpos
-        self.manual_swivel = True
+        self.camera.manual_swivel = True
 
     def mouseReleaseEvent(self, ev):
-        self.manual_swivel = False
+        self.camera.manual_swivel = False
 
     def update_boost_pad_data(self):
-        pads = self.arena.get_boost_pads()
-
-        if len(pads) != len(self.pads_mi):
+        pads = self.snapshot.pads
+        if len(pads) != len(self.pad_transforms):
+            self.update_layout()
             self.init_pads()
 
-        for i, pad in enumerate(pads):
-            pad_state = pad.get_state()
-            if i < len(self.pads_mi):
-                self.pads_mi[i].show() if pad_state.is_active else self.pads_mi[i].hide()
+        # only touch the pads whose state changed since the last frame
+        changed = pads != self.pad_state
+        if not changed.any():
+            return
+
+        activity_changed = (pads["is_active"] != self.pad_state["is_active"]).any()
+        self.pad_state[:] = pads
+
+        changed_indices = np.flatnonzero(changed)
+        is_active = pads["is_active"][changed_indices]
+        progress = 1 - pads["cooldown"][changed_indices] / self.pad_max_cooldowns[changed_indices]
+        progress = np.where(is_active, 1, np.clip(progress, 0.05, 1))
+        self.pad_models[changed_indices, :, 2] = self.pad_transforms[changed_indices, :, 2] * progress[:, None]
+        self.pads_item.setInstanceData(self.pad_models)
+
+        if activity_changed:
+            self.pads_item.setInstanceColors(
+                self.pad_colors * np.where(pads["is_active"], 1, 0.3)[:, None])
 
     def update_ball_data(self):
 
         # plot ball data
-        ball_state = self.arena.ball.get_state()
+        ball = self.snapshot.ball
+        ball_pos = ball["pos"] * mirror_x
 
         # approx ball spin
-        ball_angvel_np = np.array([ball_state.ang_vel.x, -ball_state.ang_vel.y, ball_state.ang_vel.z])
+        ball_angvel_np = ball["ang_vel"] * [1, -1, 1]
         rot_angle = np.linalg.norm(ball_angvel_np)
         rot_axis = ball_angvel_np / max(1e-9, rot_angle)
-        delta_rot_angle = rot_angle * self.tick_skip / self.arena.tick_rate
+        delta_ticks = 0
+        if self.last_tick_count is not None:
+            delta_ticks = max(self.snapshot.tick_count - self.last_tick_count, 0)
+        self.last_tick_count = self.snapshot.tick_count
+        delta_rot_angle = rot_angle * delta_ticks / self.layout.tick_rate
 
         self.ball_mi.rotate(delta_rot_angle / math.pi * 180, *rot_axis, local=False)
 
         # location
         ball_transform = self.ball_mi.transform()
-        ball_transform[0, 3] = -ball_state.pos.x
-        ball_transform[1, 3] = ball_state.pos.y
-        ball_transform[2, 3] = ball_state.pos.z
+        ball_transform[0, 3] = ball_pos[0]
+        ball_transform[1, 3] = ball_pos[1]
+        ball_transform[2, 3] = ball_pos[2]
         self.ball_mi.setTransform(ball_transform)
 
         # ball ground projection
         self.ball_proj.resetTransform()
-        self.ball_proj.translate(-ball_state.pos.x, ball_state.pos.y, 0)
-
-    def update_cars_data(self):
-
-        cars = self.arena.get_cars()
+        self.ball_proj.translate(ball_pos[0], ball_pos[1], 0)
 
-        if set([car.id for car in cars]) != set(self.car_mi_dict.keys()):
-            self.init_cars()
-
-        for car in cars:
-            if car.id not in self.car_mi_dict:
-                continue
+        if self.ball_predictor is not None:
+            self.update_ball_prediction()
 
-            car_state = car.get_state()
-            car_angles = car_state.rot_mat.as_angle()
+    def update_ball_prediction(self):
+        tick_count = int(self.snapshot.tick_count)
+        self.ball_predictor.update(tick_count, self.snapshot.ball, self.snapshot.ball_state)
 
-            self.car_mi_dict[car.id].resetTransform()
+        prediction = self.ball_predictor.prediction
+        if prediction is None:
+            return
 
-            # location
-            self.car_mi_dict[car.id].translate(-car_state.pos.x, car_state.pos.y, car_state.pos.z)
+        # marker transforms are only built once per prediction
+        if prediction is not self.drawn_prediction:
+            positions = prediction.positions[::self.prediction_marker_ticks]
+            self.prediction_models = np.tile(np.eye(4), (len(positions), 1, 1))
+            self.prediction_models[:, :3, :3] *= self.prediction_scale
+            self.prediction_models[:, :3, 3] = positions * mirror_x
+            self.prediction_item.setInstanceColors(
+                np.tile(PREDICTION_COLOR, (len(positions), 1)))
+            self.drawn_prediction = prediction
+            self.first_prediction_marker = None
+
+        # hide markers the ball already passed
+        first_marker = prediction.get_first_marker(tick_count, self.prediction_marker_ticks)
+        if first_marker != self.first_prediction_marker:
+            self.first_prediction_marker = first_marker
+            self.prediction_item.setInstanceData(self.prediction_models[first_marker:])
 
-            # rotation
-            self.car_mi_dict[car.id].rotate(car_angles.yaw / math.pi * 180, 0, 0, -1, local=True)
-            self.car_mi_dict[car.id].rotate(car_angles.pitch / math.pi * 180, 0, 1, 0, local=True)
-            self.car_mi_dict[car.id].rotate(car_angles.roll / math.pi * 180, -1, 0, 0, local=True)
+    def update_cars_data(self):
 
-            # visual indicator for going supersonic
-            edge_color = self.black_color if car_state.is_supersonic else self.white_color
-            self.car_mi_dict[car.id].opts["edgeColor"] = edge_color
+        cars = self.snapshot.cars
 
-            car_color = self.blue_color if car.team == rs.Team.BLUE else self.orange_color
-            hitbox_colors = box_colors * car_color
-            self.car_mi_dict[car.id].opts["meshdata"].setFaceColors(hitbox_colors)
+        if self.snapshot.car_ids != self.car_ids:
+            self.update_layout()
+            self.init_cars()
+            if self.snapshot.car_ids != self.car_ids:
+                return  # the source's layout doesn't match this snapshot yet, the next one will
+
+        # location and rotation
+        set_car_models(self.car_models, cars)
+
+        # visual indicator for going supersonic
+        if not np.array_equal(cars["is_supersonic"], self.car_supersonic):
+            self.car_supersonic[:] = cars["is_supersonic"]
+            self.car_edge_colors[:] = np.where(self.car_supersonic[:, None], self.black_color, self.white_color)
+            self.car_edges_item.setInstanceColors(self.car_edge_colors)
+
+        np.matmul(self.car_models, self.car_hitbox_transforms, out=self.hitbox_models)
+        np.matmul(self.car_models, self.car_axis_transforms, out=self.axis_models)
+        np.matmul(self.car_models[:, None], self.car_wheel_transforms, out=self.wheel_models)
+
+        self.cars_item.setInstanceData(self.hitbox_models)
+        self.car_edges_item.setInstanceData(self.hitbox_models)
+        self.car_axes_item.setInstanceData(self.axis_models)
+        self.wheels_item.setInstanceData(self.wheel_models)
+
+    def update_trails_data(self):
+        tick_count = self.snapshot.tick_count
+
+        # restart the trails when going back in time, e.g. seeking in a replay
+        if self.trail_tick_count is not None and tick_count < self.trail_tick_count:
+            self.ball_trail_item.clear()
+            self.car_trails_item.clear()
+            self.trail_tick_count = None
+
+        if self.trail_tick_count is None:
+            num_samples = 1
+            self.trail_tick_count = tick_count
+        else:
+            num_samples = (tick_count - self.trail_tick_count) // self.trail_sample_ticks
+            if num_samples == 0:
+                return
+            self.trail_tick_count += num_samples * self.trail_sample_ticks
+
+        # items that aren't drawn are never painted, so they'd never upload what's appended
+        if self.trails_dict["BALL"]:
+            np.multiply(self.snapshot.ball["pos"], mirror_x, out=self.ball_trail_pos[0])
+            self.ball_trail_item.append(self.ball_trail_pos, num_samples)
+        if self.trails_dict["CARS"]:
+            self.car_trails_item.append(self.car_models[:, :3, 3], num_samples)
+
+    def get_view_frustum(self):
+        view_proj = self.w.projectionMatrix() * self.w.viewMatrix()
+        return get_frustum_planes(np.array(view_proj.data()).reshape(4, 4).T)
+
+    def update_tiles_data(self):
+        # only objects inside the view are drawn
+        frustum_planes = self.get_view_frustum()
+
+        if self.tile_field_transforms is not None:
+            field_mask = in_frustum(frustum_planes, self.tile_field_centers, self.tile_field_radius)
+            if not np.array_equal(field_mask, self.tile_field_mask):
+                self.tile_field_mask = field_mask
+                # all tiles share a color, so only the transforms change
+                for field_item in self.field_items:
+                    field_item.setInstanceData(self.tile_field_transforms[field_mask])
+
+        hitbox_models = []
+        car_colors = []
+        edge_colors = []
+        for tile in self.arena_tiles:
+            tile_hitbox_models = tile.get_hitbox_models()
+            hitbox_models.append(tile_hitbox_models)
+
+            tile_car_colors = self.team_colors[tile.car_teams]
+            if self.multi_arena_mode != "tiled":
+                tile_car_colors = (tile_car_colors + tile.tint) / 2
+            car_colors.append(tile_car_colors)
+            edge_colors.append(np.broadcast_to(tile.tint, (len(tile_hitbox_models), 4)))
+
+        hitbox_models = np.concatenate(hitbox_models)
+        car_mask = in_frustum(frustum_planes, hitbox_models[:, :3, 3], CAR_CULL_RADIUS)
+        hitbox_models = hitbox_models[car_mask]
+        self.tile_cars_item.setInstanceData(hitbox_models, np.concatenate(car_colors)[car_mask])
+        self.tile_car_edges_item.setInstanceData(hitbox_models, np.concatenate(edge_colors)[car_mask])
+
+        ball_models = np.array([tile.get_ball_model() for tile in self.arena_tiles])
+        ball_mask = in_frustum(frustum_planes, ball_models[:, :3, 3], self.layout.ball_radius)
+        self.tile_balls_item.setInstanceData(ball_models[ball_mask],
+            np.array([tile.tint for tile in self.arena_tiles])[ball_mask])
 
     def update_camera_data(self):
+        self.camera.update(self.snapshot)
 
-        if self.free_cam:
+    def update_text_data(self):
+        # only rebuild the text at the configured refresh rate
+        self.fps_frames += 1
+        fps_t0 = time.perf_counter()
+        fps_dt = fps_t0 - self.fps_t0
+        refresh_rate = self.text_dict["REFRESH_RATE"]
+        if refresh_rate > 0 and fps_dt < 1 / refresh_rate:  # 0 refreshes every frame
             return
 
-        # calculate target cam values
-        if self.target_cam and not self.manual_swivel:
-            cam_pos = self.w.cameraPosition()
-            target_pos = self.get_cam_target().transform().matrix()[:3, 3]
-            rel_target_pos = (target_pos - cam_pos) * [-1, 1, 1]
-            rel_target_pos_norm = np.linalg.norm(rel_target_pos)
-
-            target_azimuth = math.atan2(rel_target_pos[1], rel_target_pos[0])
-
-            target_elevation = 0
-            if rel_target_pos_norm != 0:
-                target_elevation = math.asin(rel_target_pos[2] / rel_target_pos_norm)
-
-            smaller_target_elevation = target_elevation * 2 / 3
-            self.w.opts["azimuth"] = -target_azimuth / math.pi * 180
-            self.w.opts["elevation"] = self.cam_dict["ANGLE"] - smaller_target_elevation / math.pi * 180
-
-        if self.car_mi_dict:
+        # fps
+        fps = self.fps_frames / fps_dt
+        self.fps_t0 = fps_t0
+        self.fps_frames = 0
+
+        lines = [
+            f"fps = {fps:.0f}",
+            f"skipped_frames = {self.scheduler.skipped_frames}",
+        ]
+
+        if isinstance(self.source, ReplayPlayer):
+            player = self.source
+            paused = " (paused)" if player.paused else ""
+            lines.append(f"replay = {player.record_index}/{player.num_records}, {player.speed:g}x{paused}")
+        elif isinstance(self.source, StreamSource):
+            stats = self.source.stats()
+            connected = "" if stats["connected"] else " (disconnected)"
+            lines.append(f"stream = {stats['bytes_per_second'] / 1000:.1f} kB/s, "
+                         f"{stats['frames_dropped']} dropped, {stats['frames_skipped']} skipped{connected}")
+        elif self.step_arena:
+            if self.sim_thread is None:
+                ticks = f"{self.sim_clock.last_ticks} ticks/frame"
+            else:
+                ticks = f"{self.sim_thread.ticks_per_step} ticks/step"
+            lines.append(f"sim_speed = {self.sim_clock.get_label()}, {ticks}")
 
-            car = self.arena.get_car_from_id(self.car_id, None)
-            if car:
-                car_state = car.get_state()
-                # center camera around the car
-                self.w.opts["center"] = pg.Vector(-car_state.pos.x, car_state.pos.y,
-                    car_state.pos.z + self.cam_dict["HEIGHT"])
+        if self.profiler.enabled and self.profiler.samples:
+            lines.append("")
+            lines += self.profiler.overlay_lines()
 
-                if not self.target_cam and not self.manual_swivel:
-                    # non-target_cam cam
-                    car_vel_2d_norm = math.sqrt(car_state.vel.y ** 2 + car_state.vel.x ** 2)
-                    if car_vel_2d_norm > 50:  # don't be sensitive to near 0 vel changes
-                        car_vel_azimuth = math.atan2(car_state.vel.y, car_state.vel.x)
-                        self.w.opts["azimuth"] = -car_vel_azimuth / math.pi * 180
-                        self.w.opts["elevation"] = self.cam_dict["ANGLE"]
+        # live arenas have the full state objects, other sources only have the snapshot records
+        variables = {}
+        variables["ball_state"] = self.snapshot.ball_state
+        if variables["ball_state"] is None:
+            variables["ball_state"] = self.snapshot.ball
 
-    def update_text_data(self):
-        text = ""
+        # car info
+        car = self.snapshot.get_car(self.car_id)
+        if car is not None:
+            if self.snapshot.car_states:
+                car_state = self.snapshot.car_states[self.snapshot.car_index[self.car_id]]
+                variables["car_state"] = car_state
+                variables["last_controls"] = car_state.last_controls
+            else:
+                variables["car_state"] = car
+                variables["last_controls"] = dict(zip(control_names, car["controls"].tolist()))
+
+        for var_name, var in variables.items():
+            lines.append("")
+            lines.append(f"{var_name}:")
+            if isinstance(var, (dict, np.ndarray, np.void)):
+                for key, formatter in get_text_fields(var):
+                    lines.append(f"{key} = {formatter(var[key])}")
+            else:
+                for key, formatter in get_text_fields(var):
+                    lines.append(f"{key} = {formatter(getattr(var, key))}")
 
-        # fps
-        fps = 0
-        fps_t0 = time.perf_counter()
-        if fps_t0 != self.fps_t0:
-            fps = 1 / (fps_t0 - self.fps_t0)
-        self.fps_t0 = fps_t0
-        text += f"fps = {fps:.0f}\n"
-        text += f"tick_time_drift = {self.tick_time_drift * 1000:.3f} ms\n"
+        self.text_item.setLines(lines)
 
-        ball_state = self.arena.ball.get_state()
-        var_names = ["ball_state"]
+    def update_snapshot(self):
+        if self.source is not None:
+            self.source.update_snapshot(self.snapshot)
+        elif self.sim_thread is not None:
+            self.sim_thread.read_snapshot(self.snapshot, self.interpolate)
+        else:
+            self.snapshot.update(self.arena)
 
-        # car info
-        if self.car_mi_dict:
-            car = self.arena.get_car_from_id(self.car_id, None)
-            car_state = car.get_state()
-            last_controls = car_state.last_controls
-            var_names += ["car_state", "last_controls"]
-
-        for var_name in var_names:
-            var = locals()[var_name]
-            text += f"\n{var_name}:\n"
-            for key in dir(var):
-                if "last_rel_dodge_torque" in key:  # skip deprecated alias
-                    continue
-                value = getattr(var, key)
-                if not key.startswith("_"):
-                    if not isinstance(value, (bool, int)):
-                        try:
-                            text += f"{key} = {value:.2f}\n"
-                        except TypeError:
-                            pass
-                    else:
-                        text += f"{key} = {value}\n"
-
-        self.text_item.text = text
+        for tile in self.arena_tiles:
+            tile.update_snapshot(self.interpolate)
 
     def update_plot_data(self):
-        self.update_boost_pad_data()
-        self.update_ball_data()
-        self.update_cars_data()
-        self.update_camera_data()
+        profiler = self.profiler
+        with profiler.measure("boost_pads"):
+            self.update_boost_pad_data()
+        with profiler.measure("ball"):
+            self.update_ball_data()
+        with profiler.measure("cars"):
+            self.update_cars_data()
+        if self.trails_dict["BALL"] or self.trails_dict["CARS"]:
+            with profiler.measure("trails"):
+                self.update_trails_data()
+        if self.arena_tiles:
+            with profiler.measure("tiles"):
+                self.update_tiles_data()
+        with profiler.measure("camera"):
+            self.update_camera_data()
         if self.enable_debug_text:
-            self.update_text_data()
+            with profiler.measure("text"):
+                self.update_text_data()
         self.w.update()
 
-    def update_controls(self):
-        controls = self.controller.get_controls()
-        controls.clamp_fix()
-        car = self.arena.get_car_from_id(self.car_id, None)
+    def set_car_controls(self, car_id, controls):
+        if self.arena is None:
+            return
+
+        # the sim thread applies controls itself so they never change in the middle of a step
+        if self.sim_thread is not None:
+            self.sim_thread.set_controls(car_id, controls)
+            return
+
+        car = self.arena.get_car_from_id(car_id, None)
         if car:
             car.set_controls(controls)
+            if self.controls_recorder is not None:
+                self.controls_recorder.record(self.arena.tick_count, car_id, controls)
 
-    def update(self):
+    def update_controls(self):
+        controls = self.controller.get_controls()
+        controls.clamp_fix()
+        self.set_car_controls(self.car_id, controls)
+
+        # time from the newest input event to its controls being applied
+        event_time = self.controller.controls_event_time
+        if event_time != self.last_input_time:
+            self.last_input_time = event_time
+            if event_time:
+                self.profiler.add("input_latency", time.perf_counter() - event_time)
+
+    def set_batch_controls(self, controls):
+        # controls for every car at once, an (n_cars, 8) array with rows in snapshot car order and
+        # columns in control_names order, or a callable taking the snapshot and returning one.
+        # The car controlled with overwrite_controls keeps its controller's controls. None to stop.
+        self.batch_controls = controls
+
+    def update_batch_controls(self):
+        values = self.batch_controls
+        if callable(values):
+            values = values(self.snapshot)
+        # rows follow the snapshot the values were computed from, the drawn layout can lag behind it
+        car_ids = self.snapshot.car_ids
+        values = np.asarray(values, dtype=np.float32)
+        if values.shape != (len(car_ids), len(control_names)):
+            raise ValueError(f"Expected batch controls of shape {(len(car_ids), len(control_names))}, got {values.shape}")
+
+        # the sim thread holds on to the controls until its next step, so it gets new ones every frame
+        if self.sim_thread is not None or len(self.batch_car_controls) != len(car_ids):
+            self.batch_car_controls = [rs.CarControls() for _ in car_ids]
+        set_controls_from_batch(self.batch_car_controls, values)
+        human_car_id = self.car_id if self.overwrite_controls else None
+        for car_id, controls in zip(car_ids, self.batch_car_controls):
+            if car_id != human_car_id:
+                self.set_car_controls(car_id, controls)
+
+    def update(self, num_steps=1):
+        # num_steps is how many times the arena is stepped by tick_skip, more than 1 to catch up
         # only set car controls if overwrite_controls is true and there's at least one car
-        if self.overwrite_controls and self.car_mi_dict:
-            self.update_controls()
-
-        # only call arena.step() if running in standalone mode
+        if self.batch_controls is not None and self.car_ids:
+            with self.profiler.measure("batch_controls"):
+                self.update_batch_controls()
+
+        if self.overwrite_controls and self.car_ids:
+            with self.profiler.measure("controls"):
+                self.update_controls()
+
+        # only call arena.step() if running in standalone mode without a sim thread,
+        # the number of ticks per frame follows the sim speed
+        num_ticks = 0
+        if self.step_arena and self.sim_thread is None:
+            num_ticks = self.sim_clock.get_ticks(num_steps, self.scheduler.frame_dt)
+        if num_ticks > 0:
+            step_start_time = time.perf_counter()
+            with self.profiler.measure("step"):
+                self.controller.step_arena(self.arena, num_ticks)
+                for tile in self.arena_tiles:
+                    tile.arena.step(num_ticks)
+            self.sim_clock.add_step_time(num_ticks, time.perf_counter() - step_start_time)
+
+        with self.profiler.measure("snapshot"):
+            self.update_snapshot()
+
+        with self.profiler.measure("update"):
+            self.update_plot_data()
+
+    def is_idle(self):
+        if self.idle_fps is None:
+            return False
+        if self.w.isMinimized() or not self.w.isActiveWindow():
+            return True
         if self.step_arena:
-            self.arena.step(self.tick_skip)
-
-        self.update_plot_data()
+            return self.sim_clock.paused
+        return getattr(self.source, "paused", False)
 
     def tick(self):
-        while True:
-            wait_t0 = time.perf_counter()
-            tick_time_dt = wait_t0 - self.tick_time
-            desired_dt = 1 / self.fps - tick_time_dt - self.tick_time_drift
-            if desired_dt < 1e-7:
-                break
-            elif desired_dt > 5e-4:  # sleep_until is innacurate below this threshold on windows
-                time.sleep(desired_dt - 5e-4)
-        tick_time = time.perf_counter()
-        self.tick_time_drift += tick_time - self.tick_time - 1 / self.fps
-        self.tick_time_drift = max(min(self.tick_time_drift, 1 / self.fps), - 1 / self.fps)
-        self.tick_time = tick_time
-        self.update()
+        if not self.vsync or self.idle:
+            self.scheduler.wait()
+
+        frame_time = time.perf_counter()
+        self.profiler.add("frame", frame_time - self.frame_time)
+        self.frame_time = frame_time
+
+        self.idle = self.is_idle()
+        render_dt = 1 / self.idle_fps if self.idle else 1 / self.fps
+        self.update(self.scheduler.begin_frame(render_dt))
+        self.schedule_next_frame()
+
+    def schedule_next_frame(self):
+        if self.vsync and not self.idle:
+            # the next frame starts when this one is swapped, the timer only covers missed swaps
+            self.timer.start(round(2000 / self.fps))
+            return
+
+        # wake up a bit early, the rest is slept precisely in tick
+        delay = self.scheduler.time_until_next_frame()
+        self.timer.start(max(int(delay * 1000) - 1, 0))
+
+    def on_vsync_swap(self):
+        if not self.idle and self.timer is not None:
+            self.timer.start(0)
 
     def start(self):
-        timer = QtCore.QTimer()
-        timer.timeout.connect(self.tick)
-        timer.start()
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.scheduler.reset()
+        self.timer.start(0)
+        sim_threads = [self.sim_thread] if self.sim_thread is not None else []
+        if self.ball_predictor is not None:
+            sim_threads.append(self.ball_predictor)
+        for sim_thread in sim_threads:
+            sim_thread.start()
         self.app.exec()
+        for sim_thread in sim_threads:
+            sim_thread.stop()
+        # the sim thread records the controls it applies, it has to be done before the file is closed
+        for sim_thread in sim_threads:
+            sim_thread.join()
+        if self.controls_recorder is not None:
+            self.controls_recorder.close()
 
 
 class VisualizerThread(threading.Thread):
@@ -0,0 +1,170 @@
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from rocketsimvisualizer import Visualizer
+from rocketsimvisualizer.arena_mesh import get_arena_mesh
+from rocketsimvisualizer.controls_recording import ControlsReplayController
+import RocketSim as rs
+
+import subprocess
+import platform
+import functools
+import argparse
+import json
+import time
+import sys
+
+GAME_MODES = ("SOCCAR", "HOOPS", "HEATSEEKER", "SNOWDAY", "THE_VOID")
+CAR_COUNTS = (1, 2, 4, 8, 16)
+IMPORT_STATEMENTS = {
+    "package": "import rocketsimvisualizer",
+    "recorder": "from rocketsimvisualizer import Recorder",
+    "shared_memory": "from rocketsimvisualizer import SharedMemoryPublisher",
+    "visualizer": "from rocketsimvisualizer import Visualizer",
+}
+
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def make_arena(game_mode, num_cars, tick_rate=120):
+    arena = rs.Arena(game_mode, tick_rate=tick_rate)
+    for i in range(num_cars):
+        arena.add_car(rs.Team.BLUE if i % 2 else rs.Team.ORANGE, rs.CarConfig(0))
+    return arena
+
+
+def time_imports(repeats=3):
+    # timed inside fresh interpreters since imports are cached
+    code = "import time; t0 = time.perf_counter(); {}; print(time.perf_counter() - t0)"
+    results = {}
+    for name, statement in IMPORT_STATEMENTS.items():
+        times = []
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable, "-c", code.format(statement)],
+                capture_output=True, text=True, check=True).stdout
+            times.append(float(output))
+        results[name] = min(times)
+    return results
+
+
+def time_mesh_loading(meshes_path, repeats):
+    results = {}
+    for subfolder in ("soccar", "hoops"):
+        for use_cache in (False, True):
+            times = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                get_arena_mesh(meshes_path, subfolder, use_cache=use_cache)
+                times.append(time.perf_counter() - t0)
+            results[f"{subfolder}{'_cached' if use_cache else ''}"] = {"min": min(times), "mean": sum(times) / len(times)}
+    return results
+
+
+def run_case(game_mode, num_cars, args):
+    arena = make_arena(game_mode, num_cars)
+
+    t0 = time.perf_counter()
+    # replaying recorded controls makes the cars drive the same way on every run
+    controller_class = None
+    if args.controls:
+        controller_class = functools.partial(ControlsReplayController, path=args.controls)
+    v = Visualizer(arena, meshes_path=args.meshes_path, step_arena=True, enable_profiler=True,
+        controller_class=controller_class)
+    init_time = time.perf_counter() - t0
+
+    # drive frames directly instead of through the paced timer loop
+    for i in range(args.warmup + args.frames):
+        if i == args.warmup:
+            v.profiler.reset()
+        v.update()
+        if args.render:
+            with v.profiler.measure("render"):
+                v.w.grabFramebuffer()
+
+    result = {
+        "game_mode": game_mode.name if hasattr(game_mode, "name") else str(game_mode),
+        "num_cars": num_cars,
+        "init_seconds": init_time,
+        "stages": v.profiler.summary(),
+    }
+    v.w.close()
+    v.app.processEvents()
+    return result
+
+
+def compare(results, baseline_path):
+    # relative change of every stage mean against an earlier output of this script
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    baseline_runs = {(run["game_mode"], run["num_cars"]): run for run in baseline["runs"]}
+
+    for run in results["runs"]:
+        baseline_run = baseline_runs.get((run["game_mode"], run["num_cars"]), None)
+        if baseline_run is None:
+            continue
+        for stage, stats in run["stages"].items():
+            baseline_stats = baseline_run["stages"].get(stage, None)
+            if baseline_stats and baseline_stats["mean"] > 0:
+                change = stats["mean"] / baseline_stats["mean"] - 1
+                print(f"{run['game_mode']} {run['num_cars']} cars {stage}: {change * 100:+.1f}%", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the visualizer's per-frame pipeline")
+    parser.add_argument("--meshes-path", default="collision_meshes")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--modes", nargs="+", default=GAME_MODES)
+    parser.add_argument("--cars", nargs="+", type=int, default=CAR_COUNTS)
+    parser.add_argument("--render", action="store_true", help="also render every frame to an offscreen buffer")
+    parser.add_argument("--controls", help="controls recording to replay, see record_controls in Visualizer")
+    parser.add_argument("--output", help="json file, printed to stdout by default")
+    parser.add_argument("--compare", help="json output of an earlier run to compare against")
+    args = parser.parse_args()
+
+    rs.init(args.meshes_path)
+
+    results = {
+        "meta": {
+            "commit": get_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "render": args.render,
+            "controls": args.controls,
+        },
+        "import_seconds": time_imports(),
+        "mesh_loading": time_mesh_loading(args.meshes_path, repeats=3),
+        "runs": [],
+    }
+
+    for mode_name in args.modes:
+        if not hasattr(rs.GameMode, mode_name):
+            print(f"Skipping {mode_name}, not supported by this RocketSim version", file=sys.stderr)
+            continue
+        for num_cars in args.cars:
+            result = run_case(getattr(rs.GameMode, mode_name), num_cars, args)
+            update = result["stages"].get("update", {})
+            print(f"{mode_name} {num_cars} cars: init {result['init_seconds'] * 1000:.1f} ms, "
+                  f"update_plot_data {update.get('mean', 0) * 1000:.3f} ms", file=sys.stderr)
+            results["runs"].append(result)
+
+    if args.compare:
+        compare(results, args.compare)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
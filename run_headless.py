@@ -0,0 +1,32 @@
+from rocketsimvisualizer.headless import HeadlessRenderer
+from rocketsimvisualizer import ReplayPlayer
+import tomllib
+import sys
+
+with open("rsvconfig.toml", "rb") as file:
+    config_dict = tomllib.load(file)
+
+
+def print_progress(frames, fps):
+    print(f"Rendered {frames} frames, {fps:.1f} fps")
+
+
+def main():
+    # render a recording without a display, e.g. python run_headless.py episode.rsvrec episode.mp4
+    player = ReplayPlayer(sys.argv[1] if len(sys.argv) > 1 else "episode.rsvrec")
+
+    renderer = HeadlessRenderer(source=player,
+                                output=sys.argv[2] if len(sys.argv) > 2 else "frames",  # png folder or video file
+                                every_n_ticks=2,  # 1 by default, render every Nth tick
+                                size=(1280, 720),  # (1280, 720) by default
+                                video_fps=60,  # 60 by default, used for video files
+                                software_gl=False,  # False by default, force Mesa software rendering
+                                meshes_path="collision_meshes",
+                                config_dict=config_dict)
+    stats = renderer.render(progress=print_progress)
+    renderer.close()
+    print(f"Rendered {stats['frames']} frames in {stats['seconds']:.1f}s ({stats['fps']:.1f} fps)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+from rocketsimvisualizer import Visualizer, ReplayPlayer
+import tomllib
+import sys
+
+with open("rsvconfig.toml", "rb") as file:
+    config_dict = tomllib.load(file)
+
+
+def main():
+    # play back a file written by rocketsimvisualizer.recording.Recorder
+    player = ReplayPlayer(sys.argv[1] if len(sys.argv) > 1 else "episode.rsvrec",
+                          speed=1.0,  # 1.0 by default, negative to play in reverse
+                          loop=True)  # False by default, restart when reaching the end
+
+    v = Visualizer(source=player,  # used instead of an arena
+                   meshes_path="collision_meshes",
+                   config_dict=config_dict)
+    v.start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from rocketsimvisualizer.shm_stream import run_viewer
+import tomllib
+import sys
+
+with open("rsvconfig.toml", "rb") as file:
+    config_dict = tomllib.load(file)
+
+
+def main():
+    # render arenas published by rocketsimvisualizer.SharedMemoryPublisher in another process
+    run_viewer(sys.argv[1] if len(sys.argv) > 1 else "rocketsimvisualizer",
+               meshes_path="collision_meshes",
+               config_dict=config_dict)
+
+
+if __name__ == "__main__":
+    main()
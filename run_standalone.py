@@ -33,10 +33,17 @@ def main():
     v = Visualizer(arena,  # required, the rest is optional
                    meshes_path=meshes_path,  # relative path "collision_meshes" by default
                    fps=60,  # 60 by default
+                   vsync=False,  # False by default, pace frames with the display refresh instead of a timer
+                   idle_fps=10,  # 10 by default, frame rate when paused/unfocused/minimized, None to disable
+                   field_lod="full",  # "full" by default, "feature_edges", "faces" or "edges" are cheaper to draw
                    step_arena=True,  # False by default, handle physics ticks
                    tick_skip=2,  # tick_rate / fps by default, used if step_arena is True
+                   threaded_sim=False,  # False by default, step physics in a background thread
+                   sim_speed=1.0,  # 1.0 by default, 0.25 to 64 or None for unlimited, changed at runtime with the playback inputs
                    enable_debug_text=True,  # True by default, render debug info
+                   enable_profiler=False,  # False by default, per-stage frame timings in the debug info
                    overwrite_controls=True,  # False by default, use Keyboard/Controller
+                   record_controls=None,  # None by default, file to log applied controls to for ControlsReplayController
                    config_dict=config_dict,  # None by default, camera/input config
                    controller_class=CompositeController)  # None by default, controller type
     v.start()
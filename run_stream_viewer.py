@@ -0,0 +1,18 @@
+from rocketsimvisualizer.net_stream import run_viewer, DEFAULT_ADDRESS
+import tomllib
+import sys
+
+with open("rsvconfig.toml", "rb") as file:
+    config_dict = tomllib.load(file)
+
+
+def main():
+    # render arenas published by rocketsimvisualizer.StreamPublisher, e.g. on a training node
+    # tcp://host:port and unix:///path connect to the publisher, udp://host:port listens for it
+    run_viewer(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ADDRESS,
+               meshes_path="collision_meshes",
+               config_dict=config_dict)
+
+
+if __name__ == "__main__":
+    main()
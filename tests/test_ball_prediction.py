@@ -0,0 +1,40 @@
+from rocketsimvisualizer.snapshot import ArenaSnapshot
+
+import numpy as np
+import pytest
+
+
+def make_snapshot(tick_count, x):
+    snapshot = ArenaSnapshot(num_cars=1, num_pads=0)
+    snapshot.tick_count = tick_count
+    snapshot.ball["pos"] = [x, 0, 93]
+    snapshot.cars["id"] = 1
+    snapshot.update_car_index()
+    return snapshot
+
+
+def test_lerp_keeps_integer_tick_count():
+    prev, cur = make_snapshot(10, 0), make_snapshot(12, 100)
+    snapshot = ArenaSnapshot()
+    snapshot.lerp(prev, cur, 0.5)
+
+    assert snapshot.tick_count == 12
+    assert isinstance(snapshot.tick_count, int)
+    assert snapshot.ball["pos"][0] == pytest.approx(50)
+
+
+def test_prediction_from_interpolated_snapshot():
+    ball_prediction = pytest.importorskip("rocketsimvisualizer.ball_prediction")
+
+    prev, cur = make_snapshot(10, 0), make_snapshot(12, 100)
+    snapshot = ArenaSnapshot()
+    snapshot.lerp(prev, cur, 0.25)
+
+    positions = np.arange(31 * 3, dtype=float).reshape(31, 3)
+    prediction = ball_prediction.BallPrediction(8, positions)
+    assert np.array_equal(prediction.get_pos(snapshot.tick_count), positions[4])
+
+    # used to slice the marker transforms, so it has to be an int
+    first_marker = prediction.get_first_marker(snapshot.tick_count, 3)
+    assert first_marker == 2
+    assert isinstance(first_marker, int)
@@ -0,0 +1,80 @@
+from rocketsimvisualizer.snapshot import control_names
+
+import numpy as np
+import pytest
+
+generic_controller = pytest.importorskip("rocketsimvisualizer.generic_controller")
+GenericController = generic_controller.GenericController
+
+THROTTLE, STEER, PITCH, YAW, ROLL, BOOST, JUMP = (control_names.index(name)
+    for name in ("throttle", "steer", "pitch", "yaw", "roll", "boost", "jump"))
+
+
+class ActionCounter(GenericController):
+    def __init__(self, input_dict):
+        super().__init__(input_dict)
+        self.actions = []
+
+    def handle_action(self, action):
+        self.actions.append(action)
+
+
+def get_values(controller, **inputs):
+    for name, value in inputs.items():
+        controller.set_input(controller.input_index[name], value)
+    controller.publish()
+    return controller.get_state()[0]
+
+
+def test_actions_map_to_controls():
+    controller = GenericController({"W": "FORWARD", "D": "RIGHT", "J": "JUMP"})
+    values = get_values(controller, W=1, D=1, J=1)
+    assert values[THROTTLE] == 1 and values[PITCH] == -1
+    assert values[STEER] == 1 and values[YAW] == 1
+    assert values[JUMP] == 1
+
+
+def test_inverted_actions_add_up():
+    controller = GenericController({"PadRT": "THROTTLE", "PadLT": "-THROTTLE", "PadLeftY": "-PITCH"})
+    assert get_values(controller, PadRT=1)[THROTTLE] == 1
+    assert get_values(controller, PadRT=0, PadLT=0.5)[THROTTLE] == -0.5
+    # both triggers held give their difference, the right trigger no longer wins like it used to
+    assert get_values(controller, PadRT=1, PadLT=0.5)[THROTTLE] == 0.5
+    assert get_values(controller, PadLeftY=0.25)[PITCH] == -0.25
+
+
+def test_controls_are_clamped():
+    controller = GenericController({"W": "FORWARD", "Up": "THROTTLE", "K": "BOOST"})
+    get_values(controller, W=1, Up=1, K=0.2)
+    controls = controller.get_controls()
+    assert controls.throttle == 1
+    assert controls.boost
+
+
+def test_press_actions_fire_once_per_press():
+    controller = ActionCounter({"P": "PAUSE", "Space": "TARGET_CAM", "W": "FORWARD"})
+    p = controller.input_index["P"]
+    controller.set_input(p, 1)
+    controller.set_input(p, 1)  # still held
+    controller.set_input(p, 0)
+    controller.set_input(p, 1)
+    controller.set_input(controller.input_index["W"], 1)  # bound to controls, not an action
+    assert controller.actions == ["PAUSE", "PAUSE"]
+    assert get_values(controller)[THROTTLE] == 1
+
+
+def test_composite_controller_sums_both_controllers():
+    composite_controller = pytest.importorskip("rocketsimvisualizer.composite_controller")
+    input_dict = {"W": "FORWARD", "PadRT": "THROTTLE", "PadLeftX": "STEER"}
+    composite = composite_controller.CompositeController.__new__(composite_controller.CompositeController)
+    composite.kc = GenericController(input_dict)
+    composite.xc = GenericController(input_dict)
+    composite.kc.set_input(composite.kc.input_index["W"], 1)
+    composite.kc.publish(1.0)
+    composite.xc.set_input(composite.xc.input_index["PadLeftX"], -0.5)
+    composite.xc.publish(2.0)
+
+    values, event_time = composite.get_state()
+    assert values[THROTTLE] == 1 and values[STEER] == -0.5
+    assert event_time == 2.0
+    assert np.array_equal(composite.get_state()[0], values)
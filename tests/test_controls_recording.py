@@ -0,0 +1,84 @@
+from rocketsimvisualizer.snapshot import control_names
+
+import numpy as np
+import pytest
+
+controls_recording = pytest.importorskip("rocketsimvisualizer.controls_recording")
+
+
+def make_controls(throttle, jump=False):
+    controls = dict.fromkeys(control_names, 0.0)
+    controls.update(throttle=throttle, jump=jump)
+    return type("Controls", (), controls)()
+
+
+class StubCar:
+    def __init__(self, arena):
+        self.arena = arena
+
+    def set_controls(self, controls):
+        self.arena.applied.append((self.arena.tick_count, controls.throttle, controls.jump))
+
+
+class StubArena:
+    def __init__(self, car_ids):
+        self.tick_count = 0
+        self.cars = {car_id: StubCar(self) for car_id in car_ids}
+        self.steps = []
+        self.applied = []
+
+    def get_car_from_id(self, car_id, default):
+        return self.cars.get(car_id, default)
+
+    def step(self, num_ticks):
+        self.steps.append(num_ticks)
+        self.tick_count += num_ticks
+
+
+def test_record_and_read_back(tmp_path):
+    path = tmp_path / "controls.rsvctl"
+    with controls_recording.ControlsRecorder(path, tick_rate=120, buffer_size=2) as recorder:
+        recorder.record(0, 1, make_controls(1))
+        recorder.record(3, 2, make_controls(-0.5, jump=True))
+        recorder.record(8, 1, make_controls(0.25))
+
+    # a recorder killed mid-write leaves a partial record that is dropped
+    with open(path, "ab") as file:
+        file.write(b"\0" * 5)
+
+    header, records = controls_recording.read_controls_recording(path)
+    assert header["tick_rate"] == 120
+    assert records["tick_count"].tolist() == [0, 3, 8]
+    assert records["car_id"].tolist() == [1, 2, 1]
+    assert records["controls"][:, control_names.index("throttle")].tolist() == [1, -0.5, 0.25]
+    assert records["controls"][1, control_names.index("jump")] == 1
+
+
+def test_replay_splits_steps_at_recorded_ticks(tmp_path):
+    path = tmp_path / "controls.rsvctl"
+    with controls_recording.ControlsRecorder(path) as recorder:
+        recorder.record(0, 1, make_controls(1))
+        recorder.record(3, 1, make_controls(-1))
+        recorder.record(3, 2, make_controls(0.5, jump=True))
+        recorder.record(7, 3, make_controls(1))  # car that isn't in the arena
+        recorder.record(12, 1, make_controls(0))
+
+    controller = controls_recording.ControlsReplayController(path=path)
+    arena = StubArena([1, 2])
+    controller.step_arena(arena, 10)
+
+    assert arena.steps == [3, 4, 3]
+    assert arena.applied == [(0, 1, False), (3, -1, False), (3, 0.5, True)]
+    assert not controller.finished
+
+    controller.step_arena(arena, 4)
+    assert arena.steps[3:] == [2, 2]
+    assert arena.applied[-1] == (12, 0, False)
+    assert controller.finished
+
+
+def test_replay_from_records():
+    records = np.zeros(1, dtype=controls_recording.controls_record_dtype)
+    controller = controls_recording.ControlsReplayController(records=records)
+    assert controller.header is None
+    assert len(controller.records) == 1
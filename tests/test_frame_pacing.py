@@ -0,0 +1,134 @@
+from rocketsimvisualizer import frame_pacing
+from rocketsimvisualizer.frame_pacing import FrameScheduler, SimClock, MIN_SIM_SPEED, MAX_SIM_SPEED
+
+import pytest
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_time = FakeTime()
+    monkeypatch.setattr(frame_pacing, "time", fake_time)
+    return fake_time
+
+
+def test_speed_is_clamped():
+    sim_clock = SimClock(tick_skip=2)
+    for _ in range(10):
+        sim_clock.speed_up()
+    assert sim_clock.speed == MAX_SIM_SPEED
+    for _ in range(20):
+        sim_clock.slow_down()
+    assert sim_clock.speed == MIN_SIM_SPEED
+
+
+def test_unlimited_toggle_restores_speed():
+    sim_clock = SimClock(tick_skip=2, speed=4)
+    sim_clock.toggle_unlimited()
+    assert sim_clock.speed is None
+    assert sim_clock.get_label() == "unlimited"
+    sim_clock.speed_up()  # no effect while unlimited
+    assert sim_clock.speed is None
+    sim_clock.toggle_unlimited()
+    assert sim_clock.speed == 4
+
+    # slowing down from unlimited starts at the top speed
+    sim_clock.toggle_unlimited()
+    sim_clock.slow_down()
+    assert sim_clock.speed == MAX_SIM_SPEED
+
+
+def test_step_while_paused():
+    sim_clock = SimClock(tick_skip=2)
+    sim_clock.step()
+    sim_clock.step()
+    assert sim_clock.paused
+    assert sim_clock.get_label() == "1x (paused)"
+    assert sim_clock.get_ticks(num_frames=1, frame_dt=1 / 60) == 4
+    assert sim_clock.get_ticks(num_frames=1, frame_dt=1 / 60) == 0
+
+
+def test_fractional_speed_accumulates_ticks():
+    sim_clock = SimClock(tick_skip=2, speed=0.25)
+    ticks = [sim_clock.get_ticks(num_frames=1, frame_dt=1 / 60) for _ in range(4)]
+    assert ticks == [0, 1, 0, 1]
+
+
+def test_ticks_are_capped_by_throughput():
+    sim_clock = SimClock(tick_skip=2, speed=64)
+    assert sim_clock.get_ticks(num_frames=1, frame_dt=1 / 60) == 128
+
+    # physics can only step 3000 ticks per second, so a 60 fps frame has room for 40 of them
+    sim_clock.add_step_time(3000, 1.0)
+    assert sim_clock.get_ticks(num_frames=1, frame_dt=1 / 60) == 40
+    assert sim_clock.tick_accumulator == 0
+
+    # but never less than real time
+    sim_clock.set_speed(1)
+    sim_clock.ticks_per_second = 10
+    assert sim_clock.get_ticks(num_frames=3, frame_dt=1 / 60) == 6
+
+    sim_clock.set_speed(None)
+    sim_clock.ticks_per_second = 3000
+    assert sim_clock.get_ticks(num_frames=1, frame_dt=1 / 60) == 40
+
+
+def test_ticks_per_step():
+    sim_clock = SimClock(tick_skip=2, speed=0.25)
+    assert sim_clock.get_ticks_per_step() == 2
+    sim_clock.set_speed(8)
+    assert sim_clock.get_ticks_per_step() == 16
+    sim_clock.set_speed(None)
+    assert sim_clock.get_ticks_per_step() == 2 * MAX_SIM_SPEED
+
+
+def test_scheduler_steps_once_per_frame(clock):
+    scheduler = FrameScheduler(fps=50)
+    scheduler.reset()
+    steps = []
+    for _ in range(5):
+        scheduler.wait()
+        steps.append(scheduler.begin_frame())
+    assert steps == [0, 1, 1, 1, 1]
+    assert clock.now == pytest.approx(100.08)
+
+
+def test_scheduler_catches_up_late_frames(clock):
+    scheduler = FrameScheduler(fps=50, max_catchup_frames=4)
+    scheduler.reset()
+    clock.now += 0.06  # three frames late
+    assert scheduler.begin_frame() == 3
+    assert scheduler.skipped_frames == 0
+    # behind, so the next frame starts right away
+    assert scheduler.time_until_next_frame() == 0
+
+
+def test_scheduler_skips_frames_past_the_catchup_limit(clock):
+    scheduler = FrameScheduler(fps=50, max_catchup_frames=4)
+    scheduler.reset()
+    clock.now += 0.2  # ten frames late
+    assert scheduler.begin_frame() == 5  # catchup plus the frame itself
+    assert scheduler.skipped_frames == 5
+    clock.now += 0.02
+    assert scheduler.begin_frame() == 1
+
+
+def test_scheduler_idle_frames(clock):
+    scheduler = FrameScheduler(fps=50)
+    scheduler.reset()
+    scheduler.begin_frame(render_dt=0.1)
+    assert scheduler.time_until_next_frame() == pytest.approx(0.1)
+    scheduler.wait()
+    # one idle frame is five frames of arena steps, not a skip
+    assert scheduler.begin_frame(render_dt=0.1) == 5
+    assert scheduler.skipped_frames == 0
@@ -0,0 +1,199 @@
+from rocketsimvisualizer.net_stream import StreamPublisher, StreamSource, FRAME_HEADER, KEY_FRAME
+from rocketsimvisualizer.snapshot import ArenaSnapshot, ArenaLayout
+
+import numpy as np
+import pytest
+
+import threading
+import socket
+import time
+
+
+def get_free_port(kind):
+    with socket.socket(socket.AF_INET, kind) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_layout(num_cars, num_pads):
+    cars = [{"id": i + 1, "team": i % 2, "hitbox_size": [120, 84, 36], "hitbox_offset": [14, 0, 21], "wheels": []}
+        for i in range(num_cars)]
+    pads = [{"pos": [i * 100, 0, 73], "is_big": i % 5 == 0} for i in range(num_pads)]
+    return ArenaLayout(0, 120, 91.25, cars, pads)
+
+
+def make_snapshot(num_cars, num_pads, i):
+    snapshot = ArenaSnapshot(num_cars, num_pads)
+    snapshot.tick_count = i * 2
+    snapshot.ball["pos"] = [i, 2 * i, 93.15]
+    snapshot.cars["id"] = np.arange(1, num_cars + 1)
+    snapshot.cars["pos"][:, 0] = i * 10
+    snapshot.cars["boost"] = i % 100
+    snapshot.pads["is_active"] = (np.arange(num_pads) + i) % 5 != 0
+    snapshot.update_car_index()
+    return snapshot
+
+
+def wait_for(condition, timeout=5):
+    t0 = time.time()
+    while not condition():
+        assert time.time() - t0 < timeout
+        time.sleep(0.01)
+
+
+@pytest.fixture(params=["tcp", "unix", "udp"])
+def address(request, tmp_path):
+    if request.param == "unix":
+        if not hasattr(socket, "AF_UNIX"):
+            pytest.skip("no unix sockets on this platform")
+        return f"unix://{tmp_path / 'rsv.sock'}"
+    kind = socket.SOCK_DGRAM if request.param == "udp" else socket.SOCK_STREAM
+    return f"{request.param}://127.0.0.1:{get_free_port(kind)}"
+
+
+def test_round_trip(address):
+    layout = make_layout(4, 34)
+    publisher = StreamPublisher(address, keyframe_interval=10)
+    sources = []
+
+    # tcp/unix viewers connect to the publisher, udp viewers listen before the publisher sends
+    connect = threading.Thread(target=lambda: sources.append(StreamSource(address, timeout=5)))
+    connect.start()
+    i = 0
+    while connect.is_alive():
+        if publisher.viewer_attached:
+            publisher.publish_snapshot(make_snapshot(4, 34, i), layout)
+            i += 1
+        time.sleep(0.005)
+    source = sources[0]
+
+    try:
+        for _ in range(30):
+            snapshot = make_snapshot(4, 34, i)
+            publisher.publish_snapshot(snapshot, layout)
+            i += 1
+            time.sleep(0.005)
+        wait_for(lambda: source.frames_received and source.last_state is not None
+            and len(source.queue) and source.queue[-1][1] == snapshot.tick_count)
+
+        received = ArenaSnapshot()
+        source.update_snapshot(received)
+        assert received.tick_count == snapshot.tick_count
+        assert received.ball.tobytes() == snapshot.ball.tobytes()
+        assert np.array_equal(received.cars, snapshot.cars)
+        assert np.array_equal(received.pads, snapshot.pads)
+        assert source.layout.car_ids == layout.car_ids
+
+        stats = publisher.stats()
+        assert stats["keyframes"] < stats["frames"]  # the rest went out as deltas
+        assert stats["compression_ratio"] > 1
+        assert source.stats()["errors"] == 0
+    finally:
+        source.close()
+        publisher.close()
+
+
+def test_layout_arrives_with_its_state():
+    port = get_free_port(socket.SOCK_STREAM)
+    address = f"tcp://127.0.0.1:{port}"
+    publisher = StreamPublisher(address)
+    sources = []
+    connect = threading.Thread(target=lambda: sources.append(StreamSource(address, timeout=5)))
+    connect.start()
+    while connect.is_alive():
+        if publisher.viewer_attached:
+            publisher.publish_snapshot(make_snapshot(2, 0, 0), make_layout(2, 0))
+        time.sleep(0.005)
+    source = sources[0]
+
+    try:
+        publisher.publish_snapshot(make_snapshot(3, 0, 1), make_layout(3, 0))
+        wait_for(lambda: len(source.queue) and source.queue[-1][2] == 3)
+
+        # the source only switches layouts together with the state that uses it
+        received = ArenaSnapshot()
+        source.update_snapshot(received)
+        assert len(received.cars) == 3
+        assert source.layout.car_ids == [1, 2, 3]
+    finally:
+        source.close()
+        publisher.close()
+
+
+def connect_udp(address, layout):
+    publisher = StreamPublisher(address, keyframe_interval=5)
+    sources = []
+    connect = threading.Thread(target=lambda: sources.append(StreamSource(address, timeout=5)))
+    connect.start()
+    i = 0
+    while connect.is_alive():
+        publisher.publish_snapshot(make_snapshot(len(layout.cars), len(layout.pads), i), layout)
+        i += 1
+        time.sleep(0.005)
+    return publisher, sources[0]
+
+
+def test_invalid_datagram_is_skipped():
+    port = get_free_port(socket.SOCK_DGRAM)
+    layout = make_layout(2, 0)
+    publisher, source = connect_udp(f"udp://127.0.0.1:{port}", layout)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+        sender.sendto(FRAME_HEADER.pack(b"NOPE", KEY_FRAME, 1, 0, 0, 0, 0, 0), ("127.0.0.1", port))
+        sender.sendto(b"short", ("127.0.0.1", port))
+    wait_for(lambda: source.errors == 2)
+
+    # the stream keeps going after stray datagrams
+    snapshot = make_snapshot(2, 0, 1000)
+    publisher.publish_snapshot(snapshot, layout)
+    wait_for(lambda: len(source.queue) and source.queue[-1][1] == snapshot.tick_count)
+    assert source.stats()["connected"]
+    source.close()
+    publisher.close()
+
+
+def test_invalid_tcp_frame_disconnects():
+    port = get_free_port(socket.SOCK_STREAM)
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+        server.bind(("127.0.0.1", port))
+        server.listen()
+        errors = []
+
+        def connect_source():
+            try:
+                StreamSource(f"tcp://127.0.0.1:{port}", timeout=5)
+            except TimeoutError as e:
+                errors.append(e)
+
+        connect = threading.Thread(target=connect_source)
+        connect.start()
+        conn, _ = server.accept()
+        with conn:
+            t0 = time.time()
+            conn.sendall(FRAME_HEADER.pack(b"NOPE", KEY_FRAME, 1, 0, 0, 0, 0, 0))
+            connect.join()
+
+    # the receiver stopped on the bad frame, so the source gave up before its timeout
+    assert len(errors) == 1
+    assert time.time() - t0 < 5
+
+
+def test_oversized_udp_frame_is_skipped():
+    port = get_free_port(socket.SOCK_DGRAM)
+    layout = make_layout(2, 0)
+    publisher, source = connect_udp(f"udp://127.0.0.1:{port}", layout)
+
+    # random car states don't compress, so 2000 cars don't fit in a datagram
+    snapshot = make_snapshot(2000, 0, 0)
+    rng = np.random.default_rng(0)
+    for field in ("pos", "rot", "vel", "ang_vel"):
+        snapshot.cars[field] = rng.random(snapshot.cars[field].shape)
+    publisher.publish_snapshot(snapshot, make_layout(2000, 0))
+    wait_for(lambda: publisher.frames_too_large)
+
+    # the sender keeps going
+    publisher.publish_snapshot(make_snapshot(2, 0, 1), layout)
+    wait_for(lambda: not publisher.queue)
+    assert publisher.stats()["error"] is None
+    source.close()
+    publisher.close()
@@ -0,0 +1,26 @@
+from rocketsimvisualizer.profiler import FrameProfiler
+
+import threading
+
+
+def test_summary_while_other_thread_adds_and_resets():
+    profiler = FrameProfiler(history=50)
+    running = True
+
+    def add_samples():
+        i = 0
+        while running:
+            profiler.add(f"stage{i % 100}", 0.001)
+            if i % 500 == 0:
+                profiler.reset()
+            i += 1
+
+    thread = threading.Thread(target=add_samples)
+    thread.start()
+    try:
+        for _ in range(300):
+            for stats in profiler.summary().values():
+                assert stats["count"] > 0
+    finally:
+        running = False
+        thread.join()
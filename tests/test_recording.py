@@ -0,0 +1,130 @@
+from rocketsimvisualizer.recording import Recorder, RecordingReader, codecs, FOOTER
+from rocketsimvisualizer.replay import ReplayPlayer
+from rocketsimvisualizer.snapshot import ArenaSnapshot, ArenaLayout
+
+import numpy as np
+import pytest
+
+
+def make_layout(num_cars, num_pads=4):
+    cars = [{"id": i + 1, "team": i % 2, "hitbox_size": [120, 84, 36], "hitbox_offset": [14, 0, 21], "wheels": []}
+        for i in range(num_cars)]
+    pads = [{"pos": [i * 100, 0, 73], "is_big": i % 2 == 0} for i in range(num_pads)]
+    return ArenaLayout(0, 120, 91.25, cars, pads)
+
+
+def make_snapshot(num_cars, i, num_pads=4):
+    snapshot = ArenaSnapshot(num_cars, num_pads)
+    snapshot.tick_count = i * 8
+    snapshot.ball["pos"] = [i, -i, 93.15]
+    snapshot.cars["id"] = np.arange(1, num_cars + 1)
+    snapshot.cars["pos"][:, 0] = np.arange(num_cars) + i * 10
+    snapshot.cars["boost"] = i
+    snapshot.pads["is_active"] = (np.arange(num_pads) + i) % 3 != 0
+    snapshot.update_car_index()
+    return snapshot
+
+
+def assert_same_state(a, b):
+    assert a.tick_count == b.tick_count
+    assert a.ball.tobytes() == b.ball.tobytes()
+    assert np.array_equal(a.cars, b.cars)
+    assert np.array_equal(a.pads, b.pads)
+
+
+@pytest.mark.parametrize("codec", list(codecs))
+def test_round_trip(tmp_path, codec):
+    path = tmp_path / "episode.rsvrec"
+    with Recorder(path, chunk_size=4, codec=codec) as recorder:
+        recorder.set_layout(make_layout(2))
+        for i in range(10):
+            recorder.write_snapshot(make_snapshot(2, i))
+
+    reader = RecordingReader(path)
+    try:
+        assert reader.num_records == 10
+        assert len(reader.chunks) == 3  # 4 + 4 + 2
+        assert reader.uniform_chunks
+        snapshot = ArenaSnapshot()
+        for i in range(10):
+            reader.read_record(i, snapshot)
+            assert_same_state(snapshot, make_snapshot(2, i))
+        assert reader.get_layout(9).car_ids == [1, 2]
+        assert reader.find_record(8 * 5) == 5
+        assert reader.find_record(8 * 5 + 3) == 5
+    finally:
+        reader.close()
+
+
+def test_layout_change_mid_recording(tmp_path):
+    path = tmp_path / "episode.rsvrec"
+    with Recorder(path, chunk_size=4) as recorder:
+        recorder.set_layout(make_layout(2))
+        for i in range(6):
+            recorder.write_snapshot(make_snapshot(2, i))
+        # a car joined, the partial chunk is flushed before the new layout
+        recorder.set_layout(make_layout(3))
+        for i in range(6, 12):
+            recorder.write_snapshot(make_snapshot(3, i))
+
+    reader = RecordingReader(path)
+    try:
+        assert reader.num_records == 12
+        assert [chunk[0] for chunk in reader.chunks] == [4, 2, 4, 2]
+        assert not reader.uniform_chunks
+        assert [reader.find_chunk(i) for i in (0, 3, 4, 5, 6, 9, 10, 11)] == [0, 0, 1, 1, 2, 2, 3, 3]
+        assert reader.get_layout(5).car_ids == [1, 2]
+        assert reader.get_layout(6).car_ids == [1, 2, 3]
+
+        snapshot = ArenaSnapshot()
+        for i in range(12):
+            reader.read_record(i, snapshot)
+            assert_same_state(snapshot, make_snapshot(2 if i < 6 else 3, i))
+    finally:
+        reader.close()
+
+
+def test_truncated_recording(tmp_path):
+    path = tmp_path / "episode.rsvrec"
+    with Recorder(path, chunk_size=4) as recorder:
+        recorder.set_layout(make_layout(2))
+        for i in range(10):
+            recorder.write_snapshot(make_snapshot(2, i))
+
+    # a recorder that was killed has no index and maybe a partially written chunk
+    data = path.read_bytes()
+    index_offset = FOOTER.unpack_from(data, len(data) - FOOTER.size)[0]
+    path.write_bytes(data[:index_offset - 5])
+
+    reader = RecordingReader(path)
+    try:
+        assert reader.num_records == 8
+        snapshot = ArenaSnapshot()
+        reader.read_record(7, snapshot)
+        assert_same_state(snapshot, make_snapshot(2, 7))
+    finally:
+        reader.close()
+
+
+def test_replay_seek_and_step(tmp_path):
+    path = tmp_path / "episode.rsvrec"
+    with Recorder(path, chunk_size=4) as recorder:
+        recorder.set_layout(make_layout(2))
+        for i in range(10):
+            recorder.write_snapshot(make_snapshot(2, i))
+
+    player = ReplayPlayer(path)
+    try:
+        assert player.ticks_per_record == 8
+        player.seek_tick(8 * 6)
+        assert player.record_index == 6
+        player.step(-2)
+        assert player.paused and player.record_index == 4
+        player.seek(100)
+        assert player.record_index == 9
+
+        snapshot = ArenaSnapshot()
+        player.update_snapshot(snapshot)
+        assert_same_state(snapshot, make_snapshot(2, 9))
+    finally:
+        player.close()
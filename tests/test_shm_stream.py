@@ -0,0 +1,38 @@
+from rocketsimvisualizer.shm_stream import SharedMemoryPublisher, SHM_MAGIC, HEADER_SIZE
+
+from multiprocessing import shared_memory, resource_tracker
+import uuid
+
+import pytest
+
+
+def get_name():
+    return f"rsv-test-{uuid.uuid4().hex[:8]}"
+
+
+def test_replaces_segment_of_crashed_publisher():
+    name = get_name()
+    # what a killed publisher leaves behind: our memory, never unlinked
+    stale = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE)
+    stale.buf[:len(SHM_MAGIC)] = SHM_MAGIC
+    resource_tracker.unregister(stale._name, "shared_memory")
+    stale.close()
+
+    publisher = SharedMemoryPublisher(name, max_cars=2, max_pads=4)
+    try:
+        assert bytes(publisher.header["magic"]) == SHM_MAGIC
+        assert int(publisher.header["max_cars"]) == 2
+        assert int(publisher.header["write_count"]) == 0
+    finally:
+        publisher.close()
+
+
+def test_keeps_foreign_segment():
+    name = get_name()
+    foreign = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE)
+    try:
+        with pytest.raises(FileExistsError):
+            SharedMemoryPublisher(name)
+    finally:
+        foreign.close()
+        foreign.unlink()
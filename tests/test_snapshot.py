@@ -0,0 +1,36 @@
+from rocketsimvisualizer.snapshot import ArenaSnapshot, ArenaLayout
+from rocketsimvisualizer.constants import PAD_COOLDOWN_BIG, PAD_COOLDOWN_SMALL
+
+import numpy as np
+import pytest
+
+
+def test_layout_dict_keeps_pad_cooldowns():
+    layout = ArenaLayout(0, 120, 91.25, pads=[{"pos": [0, 0, 73], "is_big": True}],
+        pad_cooldown_big=5, pad_cooldown_small=2)
+    loaded = ArenaLayout.from_dict(layout.to_dict())
+    assert (loaded.pad_cooldown_big, loaded.pad_cooldown_small) == (5, 2)
+
+
+def test_old_layout_dict_gets_default_pad_cooldowns():
+    loaded = ArenaLayout.from_dict({"game_mode": 0, "tick_rate": 120, "ball_radius": 91.25, "cars": [], "pads": []})
+    assert (loaded.pad_cooldown_big, loaded.pad_cooldown_small) == (PAD_COOLDOWN_BIG, PAD_COOLDOWN_SMALL)
+
+
+def rot_z(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+
+
+@pytest.mark.parametrize("angle", [np.pi / 2, np.pi * 0.99])
+def test_lerp_keeps_rotations_orthonormal(angle):
+    prev, cur = ArenaSnapshot(num_cars=1), ArenaSnapshot(num_cars=1)
+    prev.ball["rot"] = prev.cars["rot"] = np.eye(3)
+    cur.ball["rot"] = cur.cars["rot"] = rot_z(angle)
+    snapshot = ArenaSnapshot()
+    snapshot.lerp(prev, cur, 0.5)
+
+    # a plain matrix blend would shrink these, near a half turn almost to zero
+    for rot in (snapshot.ball["rot"], snapshot.cars["rot"][0]):
+        assert np.allclose(rot @ rot.T, np.eye(3), atol=1e-5)
+        assert np.allclose(rot, rot_z(angle / 2), atol=1e-5)